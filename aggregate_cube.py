@@ -0,0 +1,326 @@
+"""
+预计算的聚合立方体 (语料 × 来源 × 月份 × 关键词)
+
+关键词维度取 entity_tagger 的固定词典 (公司/技术/政策的规范名，别名已归并)，而不是整份词表：
+单元格数只与 分组数 × 词典大小 有关，不随语料词汇增长，增量更新时各批的词维度也始终一致。
+每个单元格保存提及该词的文档数、情感值之和与平方和；词为 '*' 的单元格是该分组的全部文档。
+这三个量可以直接相加，因此上卷 (如月 -> 季度、来源 -> 语料)、切片、过滤都只是对小表求和，
+毫秒级返回，不必重新运行 analysis.py。新文章到来时只对新文章计数，各块的部分结果最后一次性并入立方体。
+
+立方体保存为列式 JSON (data/cube.json.gz)：维度列用字典编码，数值列为数组。
+同时记录构建来源 (CSV 或语料库路径)；从语料库构建时还记录已处理的最大文档 id，
+update 只读取之后新增的文档。由 CSV 构建的立方体没有水位线，拒绝增量更新 (否则整个语料库会被重复计入)。
+
+    python aggregate_cube.py build [--store data/corpus.db]    # 全量构建 (默认读 CSV)
+    python aggregate_cube.py update --store data/corpus.db     # 增量并入新文档 (须由同一语料库构建)
+    python aggregate_cube.py query --term Nvidia --corpus media --start 2025-04 --end 2025-06 --by source quarter
+
+    cube = AggregateCube.load()
+    cube.query(term='Nvidia', corpus='media', start='2025-04', end='2025-06', by=['source'])
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from corpus_store import CORPORA, CorpusStore
+from entity_tagger import ENTITIES, EntityTagger
+
+# --- 配置 ---
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+CUBE_FILE = os.path.join(ROOT_DIR, 'data', 'cube.json.gz')
+FORMAT_VERSION = 1
+
+DIMENSIONS = ['corpus', 'source', 'month', 'term']
+MEASURES = ['docs', 'sent_sum', 'sent_sq']
+# 不区分关键词 (全部文档) 的单元格
+ALL_TERMS = '*'
+# 日期缺失的文档 (如专家推文) 的月份
+NO_MONTH = ''
+# 关键词维度：实体词典的规范名
+KEY_TERMS = list(ENTITIES)
+# 由 CSV 构建的立方体的来源标记 (从语料库构建时为语料库文件的绝对路径)
+CSV_SOURCE = 'csv'
+
+_tagger = None
+
+def _default_tagger():
+    global _tagger
+    if _tagger is None:
+        _tagger = EntityTagger()
+    return _tagger
+
+def _months(df):
+    """文档所在月份 'YYYY-MM'；语料库读出的 date 列已规范化，CSV 的 Date 列逐条解析"""
+    if 'date' in df.columns:
+        raw = df['date']
+    elif 'Date' in df.columns:
+        raw = df['Date'].astype(str)
+    else:
+        return np.full(len(df), NO_MONTH, dtype=object)
+    try:
+        dt = pd.to_datetime(raw, utc=True, errors='coerce', format='mixed')
+    except (TypeError, ValueError):
+        dt = pd.to_datetime(raw, utc=True, errors='coerce')
+    return dt.dt.strftime('%Y-%m').fillna(NO_MONTH).to_numpy(dtype=object)
+
+def _quarters(months):
+    """'YYYY-MM' -> 'YYYY-Qn'"""
+    months = pd.Series(months, dtype=object)
+    known = months != NO_MONTH
+    out = months.copy()
+    out[known] = months[known].str[:4] + '-Q' + ((months[known].str[5:7].astype(int) - 1) // 3 + 1).astype(str)
+    return out.to_numpy(dtype=object)
+
+def _match(column, predicate):
+    """在 category 的取值 (而不是每一行) 上求条件，再按编码展开成行掩码"""
+    categories = column.cat.categories
+    hit = np.asarray(predicate(pd.Index(categories, dtype=object)), dtype=bool)
+    codes = column.cat.codes.to_numpy()
+    return np.append(hit, False)[codes]   # 编码 -1 (缺失) 对应末尾的 False
+
+# ============================
+# 1. 立方体
+# ============================
+
+class AggregateCube:
+    """稀疏立方体：只保存非空单元格，维度列为 category"""
+
+    def __init__(self, cells=None, watermark=None, source=None):
+        self.cells = cells if cells is not None else self._empty()
+        self.watermark = watermark   # 已并入的语料库最大文档 id
+        self.source = source         # CSV_SOURCE 或语料库路径；空立方体为 None
+
+    @staticmethod
+    def _empty():
+        frame = pd.DataFrame({d: pd.Categorical([]) for d in DIMENSIONS})
+        for m in MEASURES:
+            frame[m] = np.zeros(0, dtype=np.int64 if m == 'docs' else float)
+        return frame
+
+    def __len__(self):
+        return len(self.cells)
+
+    # --- 增量更新 ---
+
+    @staticmethod
+    def summarize(df, hits, corpus=None, source_col='Source'):
+        """对一批文档计数：每篇文档对其提及的每个关键词 (去重) 和 '*' 各计一次
+        hits 为 EntityTagger.tag_frame 的命中表，doc 为文档在 df 中的行位置"""
+        n = len(df)
+        corpora = df['corpus'].astype(str).to_numpy(dtype=object) if 'corpus' in df.columns \
+            else np.full(n, corpus, dtype=object)
+        sources = df[source_col].astype(str).to_numpy(dtype=object) if source_col in df.columns \
+            else np.full(n, '', dtype=object)
+        groups = pd.MultiIndex.from_arrays([corpora, sources, _months(df)])
+        group_codes, group_keys = pd.factorize(groups)
+        values = df['sentiment'].to_numpy(dtype=float)
+
+        # (文档, 关键词) 去重；最后一列为 '*'
+        terms = np.asarray(KEY_TERMS + [ALL_TERMS], dtype=object)
+        pairs = hits[['doc', 'entity']].drop_duplicates()
+        term_codes = pd.Categorical(pairs['entity'], categories=KEY_TERMS).codes.astype(np.int64)
+        known = term_codes >= 0
+        rows = np.concatenate([pairs['doc'].to_numpy(dtype=np.int64)[known], np.arange(n)])
+        cols = np.concatenate([term_codes[known], np.full(n, len(terms) - 1)])
+
+        # (分组, 词) 组合键一次聚合
+        combined = group_codes[rows].astype(np.int64) * len(terms) + cols
+        keys, inverse = np.unique(combined, return_inverse=True)
+        v = values[rows]
+        group_of, term_of = np.divmod(keys, len(terms))
+        part = pd.DataFrame({
+            'corpus': group_keys.get_level_values(0)[group_of],
+            'source': group_keys.get_level_values(1)[group_of],
+            'month': group_keys.get_level_values(2)[group_of],
+            'term': terms[term_of],
+            'docs': np.bincount(inverse, minlength=len(keys)).astype(np.int64),
+            'sent_sum': np.bincount(inverse, weights=v, minlength=len(keys)),
+            'sent_sq': np.bincount(inverse, weights=v * v, minlength=len(keys)),
+        })
+        return part
+
+    @classmethod
+    def partial(cls, df, hits=None, corpus=None, source_col='Source'):
+        """一批文档的部分结果 (缺少 sentiment 列时现算，缺少命中表时现标注)"""
+        import analysis
+        df = df.reset_index(drop=True)
+        df['Content'] = df['Content'].fillna('')
+        if 'sentiment' not in df.columns:
+            df['sentiment'] = df['Content'].apply(analysis.get_sentiment)
+        if hits is None:
+            hits = _default_tagger().tag_frame(df['Content'])
+        return cls.summarize(df, hits, corpus, source_col)
+
+    def merge(self, parts):
+        """把若干部分结果与现有单元格一次合并 (只做一次分组求和)"""
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            return self
+        frames = [self.cells.astype({d: object for d in DIMENSIONS})] + parts
+        merged = pd.concat(frames, ignore_index=True).groupby(DIMENSIONS, sort=True).sum().reset_index()
+        self.cells = merged.astype({d: 'category' for d in DIMENSIONS})
+        return self
+
+    def update(self, df, hits=None, corpus=None, source_col='Source'):
+        """并入一批新文档；hits 为与 df 行位置对齐的实体命中表 (可省略)"""
+        if len(df) == 0:
+            return self
+        return self.merge([self.partial(df, hits, corpus, source_col)])
+
+    def update_from_store(self, store, chunksize=5000):
+        """从语料库增量并入 id 大于水位线的文档，返回新并入的篇数
+        立方体须为空或由同一语料库构建，否则抛出 ValueError"""
+        source = os.path.abspath(store.path)
+        if len(self) and (self.watermark is None or self.source != source):
+            raise ValueError(f"立方体由 {self.source or '未知来源'} 构建，不能从 {source} 增量更新；"
+                             f"请用 build --store 重新构建")
+        parts = []
+        added = 0
+        watermark = self.watermark
+        columns = ['Source', 'Date', 'Content']
+        for chunk in store.iter_frames(columns=columns, chunksize=chunksize, after_id=self.watermark):
+            if chunk.empty:
+                continue
+            parts.append(self.partial(chunk))
+            watermark = int(chunk['id'].max())
+            added += len(chunk)
+        self.merge(parts)
+        self.watermark = watermark
+        self.source = source
+        return added
+
+    # --- 查询 ---
+
+    def query(self, term=None, corpus=None, source=None, start=None, end=None, by=('source',)):
+        """切片 + 上卷
+        term/corpus/source 可为单个值或列表；start/end 为 'YYYY-MM' (含端点)；
+        by 可取 corpus/source/month/quarter/term。
+        返回 docs (含该词的文档数)、share (占同组全部文档的比例)、mean/std (这些文档的情感)"""
+        by = list(by)
+        terms = [term] if isinstance(term, str) else term
+        if terms is not None and len(terms) > 1 and 'term' not in by:
+            by.append('term')   # 多个词分别统计，避免同一文档重复计数
+
+        cells = self.cells
+        mask = np.ones(len(cells), dtype=bool)
+        for col, wanted in [('corpus', corpus), ('source', source)]:
+            if wanted is not None:
+                mask &= _match(cells[col], lambda c: c.isin([wanted] if isinstance(wanted, str) else wanted))
+        if start is not None or end is not None:
+            lo, hi = str(start or '0000')[:7], str(end or '9999')[:7]
+            mask &= _match(cells['month'], lambda c: (c != NO_MONTH) & (c >= lo) & (c <= hi))
+        is_all = _match(cells['term'], lambda c: c == ALL_TERMS)
+        hit = mask & (_match(cells['term'], lambda c: c.isin(terms)) if terms is not None else is_all)
+
+        result = self._rollup(cells[hit], by)
+        base = [b for b in by if b != 'term']
+        totals = self._rollup(cells[mask & is_all], base)['docs']
+        if base:
+            total = totals.reindex(result.index.droplevel('term') if 'term' in by else result.index).to_numpy()
+        else:
+            total = totals.iloc[0] if len(totals) else np.nan
+        docs = result['docs'].astype(float)
+        result['share'] = docs / total
+        result['mean'] = result['sent_sum'] / docs
+        result['std'] = np.sqrt(np.maximum(result['sent_sq'] / docs - result['mean'] ** 2, 0.0))
+        return result[['docs', 'share', 'mean', 'std']]
+
+    @staticmethod
+    def _rollup(cells, by):
+        frame = cells[MEASURES].copy()
+        for b in by:
+            frame[b] = _quarters(cells['month'].astype(str)) if b == 'quarter' else cells[b].astype(str).to_numpy()
+        if not by:
+            return frame[MEASURES].sum().to_frame().T
+        return frame.groupby(by, sort=True)[MEASURES].sum()
+
+    # --- 持久化 ---
+
+    def save(self, path=CUBE_FILE):
+        """列式 JSON (gzip)：维度列字典编码，先写临时文件再替换"""
+        payload = {'format': FORMAT_VERSION, 'source': self.source, 'watermark': self.watermark,
+                   'rows': len(self.cells), 'dimensions': {}, 'measures': {}}
+        for d in DIMENSIONS:
+            col = self.cells[d].cat
+            payload['dimensions'][d] = {'values': list(col.categories), 'codes': col.codes.tolist()}
+        for m in MEASURES:
+            payload['measures'][m] = self.cells[m].tolist()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + '.tmp'
+        with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=CUBE_FILE):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            payload = json.load(f)
+        cells = pd.DataFrame({
+            d: pd.Categorical.from_codes(spec['codes'], categories=spec['values'])
+            for d, spec in payload['dimensions'].items()})
+        for m in MEASURES:
+            cells[m] = np.asarray(payload['measures'][m], dtype=np.int64 if m == 'docs' else float)
+        return cls(cells, payload.get('watermark'), payload.get('source'))
+
+# ============================
+# 2. 构建
+# ============================
+
+def build_from_csv():
+    """从 data/*.csv 全量构建 (没有水位线，之后不能增量 update)"""
+    import analysis
+    parts = []
+    for corpus, csv_path in CORPORA.items():
+        if not os.path.exists(csv_path):
+            print(f"[Warn] 找不到 {csv_path}")
+            continue
+        for chunk in analysis.iter_corpus_chunks(csv_path, ['Source', 'Date', 'Content']):
+            parts.append(AggregateCube.partial(chunk, corpus=corpus))
+    return AggregateCube(source=CSV_SOURCE).merge(parts)
+
+def main():
+    ap = argparse.ArgumentParser(description='预计算的聚合立方体')
+    ap.add_argument('--cube', default=CUBE_FILE, help='立方体文件路径')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p = sub.add_parser('build', help='全量构建 (默认读 CSV)')
+    p.add_argument('--store', default=None, help='从统一语料库构建 (之后可增量 update)')
+    p = sub.add_parser('update', help='从统一语料库增量并入新文档')
+    p.add_argument('--store', required=True)
+    q = sub.add_parser('query', help='切片/上卷查询')
+    q.add_argument('--term', nargs='+', default=None, help='关键词 (实体词典的规范名，如 Nvidia、"Entity List")')
+    q.add_argument('--corpus', default=None)
+    q.add_argument('--source', nargs='+', default=None)
+    q.add_argument('--start', default=None, help='起始月份 YYYY-MM')
+    q.add_argument('--end', default=None, help='结束月份 YYYY-MM (含)')
+    q.add_argument('--by', nargs='*', default=['source'], help='corpus/source/month/quarter/term')
+    args = ap.parse_args()
+
+    if args.cmd == 'query':
+        cube = AggregateCube.load(args.cube)
+        t0 = time.perf_counter()
+        result = cube.query(args.term, args.corpus, args.source, args.start, args.end, args.by)
+        print(result.to_string())
+        print(f"({len(cube)} 个单元格, 查询 {(time.perf_counter() - t0) * 1000:.1f} ms)")
+        return
+
+    if args.cmd == 'build' and not args.store:
+        cube = build_from_csv()
+    else:
+        with CorpusStore(args.store) as store:
+            try:
+                cube = AggregateCube.load(args.cube) if args.cmd == 'update' and os.path.exists(args.cube) \
+                    else AggregateCube()
+                added = cube.update_from_store(store)
+            except ValueError as e:
+                ap.error(str(e))
+            print(f"并入 {added} 篇新文档")
+    cube.save(args.cube)
+    print(f"立方体共 {len(cube)} 个单元格: {args.cube}")
+
+if __name__ == "__main__":
+    main()
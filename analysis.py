@@ -1,51 +1,126 @@
+import os
+import argparse
 import pandas as pd
 import numpy as np
 import re
 import networkx as nx
+import scipy.sparse as sp
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import seaborn as sns
 from textblob import TextBlob
-from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer
-from dateutil import parser
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+from grouped_stats import GroupedStats, ALL_SOURCES, time_bucket
+from bootstrap import MIN_N, BootstrapMeans, monthly_bands
+import profiling
+from corpus_store import CorpusStore
+import dtm as dtm_cache
+from dtm import DocumentTermMatrix
+from token_corpus import TokenCorpus
+from term_trends import TermTrends
+from entity_tagger import tag_corpus, entity_sentiment, co_mentions
+from profiling import stage
 import warnings
 
 # ==========================================
 # 0. 全局画图配置 (针对论文插图优化)
 # ==========================================
-warnings.filterwarnings("ignore")
-
-# 设置绘图风格
-plt.style.use('seaborn-v0_8-whitegrid')
-plt.rcParams['axes.unicode_minus'] = False
-
-# 【关键修改】全局字体放大，线条加粗
-plt.rcParams.update({
-    'font.size': 16,           # 全局默认字体大小
-    'axes.labelsize': 18,      # 坐标轴标签大小
-    'axes.titlesize': 20,      # 标题大小
-    'xtick.labelsize': 14,     # X轴刻度大小
-    'ytick.labelsize': 14,     # Y轴刻度大小
-    'legend.fontsize': 16,     # 图例大小
-    'lines.linewidth': 3.0,    # 线条宽度
-    'font.family': ['Arial', 'DejaVu Sans', 'SimHei'] # 字体优先顺序
-})
+def setup_plot_style():
+    """论文插图的全局绘图风格；只在本脚本作为主程序运行时调用，
+    其他脚本 import analysis 使用数据函数时不改变全局 rcParams"""
+    warnings.filterwarnings("ignore")
+
+    # 设置绘图风格
+    plt.style.use('seaborn-v0_8-whitegrid')
+    plt.rcParams['axes.unicode_minus'] = False
+
+    # 【关键修改】全局字体放大，线条加粗
+    plt.rcParams.update({
+        'font.size': 16,           # 全局默认字体大小
+        'axes.labelsize': 18,      # 坐标轴标签大小
+        'axes.titlesize': 20,      # 标题大小
+        'xtick.labelsize': 14,     # X轴刻度大小
+        'ytick.labelsize': 14,     # Y轴刻度大小
+        'legend.fontsize': 16,     # 图例大小
+        'lines.linewidth': 3.0,    # 线条宽度
+        'font.family': ['Arial', 'DejaVu Sans', 'SimHei'] # 字体优先顺序
+    })
+
+# --- 数据文件 ---
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+MEDIA_FILE = os.path.join(DATA_DIR, 'us_mainstream_media_data.csv')
+THINK_TANK_FILE = os.path.join(DATA_DIR, 'us_think_tank_data.csv')
+EXPERT_FILE = os.path.join(DATA_DIR, 'us_experts_twitter_data.csv')
+
+# 显式列类型：来源/作者列取值很少，用 category 存储；其余文本列按字符串读入
+CSV_DTYPES = {
+    'Source': 'category',
+    '来源': 'category',
+    'Name': 'category',
+    'Title': str,
+    'Date': str,
+    'URL': str,
+    'Content': str,
+}
+# 分析只用到这些列 (usecols 投影，其余列不读入内存)
+ANALYSIS_COLUMNS = ['Source', '来源', 'Name', 'Date', 'Content']
+CHUNK_SIZE = 5000
+
+# 月度重采样频率 (新版pandas使用ME，旧版使用M)
+try:
+    MONTH_FREQ = pd.tseries.frequencies.to_offset('ME')
+except ValueError:
+    MONTH_FREQ = pd.tseries.frequencies.to_offset('M')
 
 # ==========================================
 # 1. 数据加载与清洗
 # ==========================================
-def load_and_clean_data():
-    """加载数据并填充空值"""
+def _usecols(columns):
+    """usecols 投影；用函数形式以兼容缺少部分列的文件"""
+    if columns is None: return None
+    wanted = set(columns)
+    return lambda c: c in wanted
+
+def read_corpus(path, columns=ANALYSIS_COLUMNS):
+    """整体读取一个语料文件 (显式类型 + 列投影)"""
+    df = pd.read_csv(path, usecols=_usecols(columns), dtype=CSV_DTYPES)
+    if 'Content' in df.columns:
+        df['Content'] = df['Content'].fillna('')
+    return df
+
+def iter_corpus_chunks(path, columns=ANALYSIS_COLUMNS, chunksize=CHUNK_SIZE):
+    """按块读取语料文件，内存占用只与 chunksize 有关"""
+    reader = pd.read_csv(path, usecols=_usecols(columns), dtype=CSV_DTYPES, chunksize=chunksize)
+    for chunk in reader:
+        if 'Content' in chunk.columns:
+            chunk['Content'] = chunk['Content'].fillna('')
+        yield chunk
+
+@stage('load')
+def load_and_clean_data(store_path=None, since=None):
+    """加载数据并填充空值；指定 store_path 时从语料库按条件读取，否则读CSV"""
+    if store_path:
+        return load_from_store(store_path, since)
     try:
-        df_media = pd.read_csv('us_mainstream_media_data.csv')
-        df_think = pd.read_csv('us_think_tank_data.csv')
-        df_expert = pd.read_csv('us_experts_twitter_data.csv')
+        df_media = read_corpus(MEDIA_FILE)
+        df_think = read_corpus(THINK_TANK_FILE)
+        df_expert = read_corpus(EXPERT_FILE)
     except FileNotFoundError:
-        print("错误：找不到CSV文件，请确保文件在当前目录下。")
+        print(f"错误：找不到CSV文件，请确保文件在 {DATA_DIR} 目录下。")
+        return None, None, None
+
+    return df_media, df_think, df_expert
+
+def load_from_store(store_path, since=None):
+    """从统一语料库读取三份语料 (只取分析需要的列，可按起始日期过滤)"""
+    columns = ['Source', 'Name', 'Date', 'Content']
+    with CorpusStore(store_path) as store:
+        df_media = store.read_frame(corpus='media', start=since, columns=columns)
+        df_think = store.read_frame(corpus='think_tank', start=since, columns=columns)
+        df_expert = store.read_frame(corpus='expert', columns=columns)
+    if df_media.empty and df_think.empty and df_expert.empty:
+        print(f"错误：语料库 {store_path} 为空，请先运行 python corpus_store.py import。")
         return None, None, None
-    
-    for df in [df_media, df_think, df_expert]:
-        df['Content'] = df['Content'].fillna('')
     return df_media, df_think, df_expert
 
 def clean_text(text):
@@ -57,9 +132,9 @@ def clean_text(text):
     return text
 
 STOPWORDS = set([
-    'the', 'and', 'to', 'of', 'in', 'a', 'is', 'that', 'for', 'on', 'it', 'with', 'as', 
-    'are', 'at', 'be', 'this', 'from', 'by', 'have', 'has', 'will', 'an', 'was', 'not', 
-    'but', 'we', 'they', 'their', 'which', 'or', 'its', 'about', 'more', 'can', 'us', 
+    'the', 'and', 'to', 'of', 'in', 'a', 'is', 'that', 'for', 'on', 'it', 'with', 'as',
+    'are', 'at', 'be', 'this', 'from', 'by', 'have', 'has', 'will', 'an', 'was', 'not',
+    'but', 'we', 'they', 'their', 'which', 'or', 'its', 'about', 'more', 'can', 'us',
     'new', 'one', 'would', 'also', 'source', 'twitter', 'said', 'image', 'get', 'like',
     'just', 'out', 'up', 'all', 'what', 'so', 'who', 'if', 'when', 'there', 'do', 'no',
     'been', 'year', 'years', 'time', 'other', 'some', 'into', 'over', 'after', 'cnas', 'cset', 'csis',
@@ -67,9 +142,30 @@ STOPWORDS = set([
     'click', 'read', 'page', 'loading'
 ])
 
+def tokenize(text):
+    """清洗 + 去停用词后的词列表"""
+    return [word for word in clean_text(text).split() if word not in STOPWORDS and len(word) > 2]
+
 def remove_stopwords(text):
     return ' '.join([word for word in text.split() if word not in STOPWORDS and len(word) > 2])
 
+# 切词规则 (clean_text/tokenize 的源码与停用词表任一变化都会使DTM缓存失效)
+TOKENIZER_CONFIG = {
+    'source': dtm_cache.source_key(clean_text, tokenize),
+    'stopwords': sorted(STOPWORDS),
+}
+
+def corpus_tokens(df, tokens=None):
+    """与 df 行对齐的整数词元语料 (df 经过过滤时按 doc_id 取子集)"""
+    if tokens is not None and 'doc_id' in df.columns:
+        return tokens.subset(df['doc_id'].to_numpy())
+    return TokenCorpus.from_texts(df['Content'], tokenize)
+
+def corpus_dtm(name, df, tokens=None):
+    """语料的文档-词项矩阵 (语料与切词规则不变时直接读缓存)"""
+    build = lambda: DocumentTermMatrix.from_token_corpus(corpus_tokens(df, tokens))
+    return dtm_cache.load_or_build(name, build, dtm_cache.texts_key(df['Content']), config=TOKENIZER_CONFIG)
+
 # ==========================================
 # 2. 核心分析函数
 # ==========================================
@@ -81,33 +177,37 @@ def process_dates(df, date_col):
     """时间清洗：转UTC -> 去时区 -> 过滤2025年"""
     if date_col not in df.columns: return df
     df[date_col] = df[date_col].astype(str)
-    # 尝试解析多种日期格式
-    df['dt_date'] = pd.to_datetime(df[date_col], utc=True, errors='coerce').dt.tz_localize(None)
+    # 尝试解析多种日期格式 (逐条推断格式，分块与整表解析结果一致)
+    try:
+        dt = pd.to_datetime(df[date_col], utc=True, errors='coerce', format='mixed')
+    except (TypeError, ValueError):
+        dt = pd.to_datetime(df[date_col], utc=True, errors='coerce')
+    df['dt_date'] = dt.dt.tz_localize(None)
     df = df.dropna(subset=['dt_date'])
     df = df[df['dt_date'] >= '2025-01-01']
     return df
 
-def build_advanced_network(df, top_n=30): # 【调整】减少节点数top_n，防止拥挤，从45降到30
-    """构建SNA语义网络"""
-    if len(df) < 2: return None
-    
-    cv = CountVectorizer(max_features=top_n, stop_words='english')
-    try:
-        X = cv.fit_transform(df['processed_text'])
-    except ValueError:
-        return None
-        
-    words = cv.get_feature_names_out()
-    matrix = (X.T * X)
+def featurize(df):
+    """文本预处理 + 情感打分 (整表或单个数据块均可)
+    返回整数词元语料，df 中增加 doc_id 列 (过滤后仍可对齐) 和 sentiment 列"""
+    with stage('featurize'):
+        tokens = TokenCorpus.from_texts(df['Content'], tokenize)
+        df['doc_id'] = np.arange(len(df), dtype=np.int64)
+    with stage('sentiment'):
+        df['sentiment'] = df['Content'].apply(get_sentiment)
+    return tokens
+
+def network_from_cooccurrence(matrix, words):
+    """由词共现矩阵构建网络，并计算中心性和社区"""
     matrix.setdiag(0)
-    
+
     G = nx.from_scipy_sparse_array(matrix)
     G = nx.relabel_nodes(G, {i: w for i, w in enumerate(words)})
-    
+
     # 计算中心性和社区
     centrality = nx.degree_centrality(G)
     nx.set_node_attributes(G, centrality, 'centrality')
-    
+
     try:
         communities = nx.community.greedy_modularity_communities(G)
         community_map = {}
@@ -120,38 +220,132 @@ def build_advanced_network(df, top_n=30): # 【调整】减少节点数top_n，
 
     return G
 
+@stage('network')
+def build_advanced_network(df, top_n=30, dtm=None, tokens=None): # 【调整】减少节点数top_n，防止拥挤，从45降到30
+    """构建SNA语义网络 (优先复用已有的文档-词项矩阵 / 词元语料)"""
+    if len(df) < 2: return None
+
+    if dtm is None:
+        dtm = DocumentTermMatrix.from_token_corpus(corpus_tokens(df, tokens))
+    matrix, words = dtm.cooccurrence(top_n)
+    if not len(words):
+        return None
+    return network_from_cooccurrence(matrix, words)
+
 # ==========================================
-# 3. 执行绘图 (高清大字版)
+# 2.1 分块流式统计 (语料大于内存时使用)
 # ==========================================
 
-print(">>> 正在处理数据...")
-df_media, df_think, df_expert = load_and_clean_data()
+def stream_monthly_sentiment(path, date_col='Date', chunksize=CHUNK_SIZE):
+    """逐块打分并累加到月度分组统计，返回 (月度平均情感序列, 自助法置信带)"""
+    stats = GroupedStats(keywords={})
+    boot = BootstrapMeans()
+    for chunk in iter_corpus_chunks(path, [date_col, 'Content'], chunksize):
+        with stage('sentiment'):
+            chunk['sentiment'] = chunk['Content'].apply(get_sentiment)
+        chunk = process_dates(chunk, date_col)
+        stats.update(chunk, source_col=None)
+        with stage('bootstrap'):
+            boot.update(chunk['sentiment'], time_bucket(chunk['dt_date']))
+    series = stats.series(ALL_SOURCES)
+    if not len(series):
+        return series, None
+    bands = boot.result()
+    bands.index = pd.DatetimeIndex(bands.index)
+    series = series.asfreq(MONTH_FREQ)
+    return series, bands.reindex(series.index)
 
-if df_media is not None:
-    # 预处理
-    for df in [df_media, df_think, df_expert]:
-        df['processed_text'] = df['Content'].apply(clean_text).apply(remove_stopwords)
-        df['sentiment'] = df['Content'].apply(get_sentiment)
+# 情感分布直方图的固定分箱 (极性取值 [-1, 1])
+SENTIMENT_BINS = np.linspace(-1.0, 1.0, 401)
 
-    df_media = process_dates(df_media, 'Date')
-    df_think = process_dates(df_think, 'Date')
+def stream_sentiment_histogram(path, chunksize=CHUNK_SIZE, bins=SENTIMENT_BINS):
+    """逐块计算情感值，只累加固定分箱的直方图与总和 (内存与语料大小无关)
+    返回 (分箱中心, 各箱篇数, 精确均值)"""
+    counts = np.zeros(len(bins) - 1, dtype=np.int64)
+    total, n = 0.0, 0
+    for chunk in iter_corpus_chunks(path, ['Content'], chunksize):
+        with stage('sentiment'):
+            values = chunk['Content'].apply(get_sentiment).to_numpy(dtype=float)
+        counts += np.histogram(np.clip(values, bins[0], bins[-1]), bins=bins)[0]
+        total += values.sum()
+        n += len(values)
+    centers = (bins[:-1] + bins[1:]) / 2
+    return centers, counts, (total / n if n else float('nan'))
 
-    # --- 图表 1: 情感演化趋势 (大字版) ---
-    print(">>> 生成图表 1: 情感演化趋势 (sentiment_evolution_2025.pdf)...")
+def iter_dated_chunks(path, columns, date_col='Date', chunksize=CHUNK_SIZE):
+    """按块读取并做与整表路径相同的日期过滤 (文件没有日期列时原样返回)"""
+    for chunk in iter_corpus_chunks(path, [date_col] + columns, chunksize):
+        yield process_dates(chunk, date_col)
+
+@stage('network')
+def stream_network(path, top_n=30, chunksize=CHUNK_SIZE, date_col='Date'):
+    """两遍扫描构建SNA语义网络：第一遍统计词频选出top_n，第二遍累加共现矩阵
+    每块先经过 process_dates，与整表路径使用同一批文档"""
+    # 第一遍：词频 (各块复用同一个 TokenCorpus，词表只建一份；每块只记本块出现的词及次数)
+    tokens = TokenCorpus()
+    seen, seen_counts = [], []
+    n_docs = 0
+    for chunk in iter_dated_chunks(path, ['Content'], date_col, chunksize):
+        tokens.clear().extend(tokenize(t) for t in chunk['Content'])
+        n_docs += len(tokens)
+        ids, counts = np.unique(tokens.tokens, return_counts=True)
+        seen.append(ids)
+        seen_counts.append(counts)
+    vocab = tokens.vocab
+    if n_docs < 2 or not len(vocab): return None
+    term_counts = np.bincount(np.concatenate(seen), weights=np.concatenate(seen_counts),
+                              minlength=len(vocab)).astype(np.int64)
+
+    # 与 CountVectorizer(max_features, stop_words='english') 一致：按词频取前top_n，再按字母排序
+    words = np.array(vocab, dtype=object)
+    term_counts[[i for i, w in enumerate(vocab) if w in ENGLISH_STOP_WORDS]] = 0
+    candidates = np.flatnonzero(term_counts > 0)
+    candidates = candidates[np.argsort(words[candidates], kind='stable')]  # 同频词按字母序取舍
+    top = candidates[np.argsort(-term_counts[candidates], kind='stable')[:top_n]]
+    top = top[np.argsort(words[top])]
+    column = np.full(len(vocab), -1, dtype=np.int64)
+    column[top] = np.arange(len(top))
+
+    # 第二遍：共现矩阵 (top_n x top_n，大小固定)
+    cooc = None
+    for chunk in iter_dated_chunks(path, ['Content'], date_col, chunksize):
+        tokens.clear().extend(tokenize(t) for t in chunk['Content'])
+        cols = column[tokens.tokens]
+        keep = cols >= 0
+        X = sp.csr_matrix((np.ones(keep.sum(), dtype=np.int64), (tokens.doc_ids()[keep], cols[keep])),
+                          shape=(len(tokens), len(top)))
+        part = X.T @ X
+        cooc = part if cooc is None else cooc + part
+    return network_from_cooccurrence(cooc.tocsr(), words[top])
+
+# ==========================================
+# 3. 执行绘图 (高清大字版)
+# ==========================================
+
+@stage('render')
+def plot_sentiment_evolution(media_series, think_series, filename, media_band=None, think_band=None):
     plt.figure(figsize=(14, 8)) # 【调整】增大画布
 
-    # 重采样处理 (处理报错: 使用ME替代M以兼容新版pandas，或者保持M如果版本旧)
-    try:
-        media_series = df_media.set_index('dt_date').resample('ME')['sentiment'].mean()
-        think_series = df_think.set_index('dt_date').resample('ME')['sentiment'].mean()
-    except ValueError:
-        media_series = df_media.set_index('dt_date').resample('M')['sentiment'].mean()
-        think_series = df_think.set_index('dt_date').resample('M')['sentiment'].mean()
+    # 自助法 95% 置信带 (样本少的月份带更宽；少于 MIN_N 篇的月份没有置信带)
+    for band, color in [(media_band, '#d62728'), (think_band, '#1f77b4')]:
+        if band is not None:
+            plt.fill_between(band.index, band['lo'], band['hi'], color=color, alpha=0.15, linewidth=0)
 
     # 绘图
-    plt.plot(media_series.index, media_series.values, marker='o', markersize=10, linestyle='-', linewidth=3.5, label='Media (Public)', color='#d62728') 
+    plt.plot(media_series.index, media_series.values, marker='o', markersize=10, linestyle='-', linewidth=3.5, label='Media (Public)', color='#d62728')
     plt.plot(think_series.index, think_series.values, marker='s', markersize=10, linestyle='--', linewidth=3.5, label='Think Tank (Policy)', color='#1f77b4')
 
+    # 样本不足的月份用空心点标出 (均值仅供参考)
+    label = f'n < {MIN_N} (no CI)'
+    for series, band, color, marker in [(media_series, media_band, '#d62728', 'o'), (think_series, think_band, '#1f77b4', 's')]:
+        if band is None:
+            continue
+        sparse = (band['n'].reindex(series.index) < MIN_N).to_numpy() & series.notna().to_numpy()
+        if sparse.any():
+            plt.plot(series.index[sparse], series.values[sparse], marker=marker, markersize=10, linestyle='none',
+                     markerfacecolor='white', markeredgewidth=2.5, color=color, label=label)
+            label = None
+
     # 设置轴格式
     ax = plt.gca()
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
@@ -164,75 +358,160 @@ if df_media is not None:
     plt.legend(fontsize=16, frameon=True, framealpha=0.9, facecolor='white')
     plt.grid(True, alpha=0.3)
     plt.tight_layout()
-    plt.savefig('sentiment_evolution_2025.pdf', dpi=300, format='pdf')
+    plt.savefig(filename, dpi=300, format='pdf')
 
-    # --- 图表 2: 专家情感分布 (大字版) ---
-    print(">>> 生成图表 2: 专家情感分布 (expert_sentiment_distribution.pdf)...")
+@stage('render')
+def plot_expert_distribution(sentiments, filename, weights=None, mean=None):
+    """sentiments 为情感值；流式路径传入分箱中心 + weights (各箱篇数) + 精确均值"""
     plt.figure(figsize=(12, 8)) # 【调整】增大画布
-    sns.histplot(df_expert['sentiment'], kde=True, color='#2ca02c', bins=15, alpha=0.6, edgecolor='white', linewidth=1.5)
-    
-    mean_val = df_expert['sentiment'].mean()
+    if weights is not None:
+        keep = np.asarray(weights) > 0
+        sentiments, weights = np.asarray(sentiments)[keep], np.asarray(weights)[keep]
+    sns.histplot(x=sentiments, weights=weights, kde=True, color='#2ca02c', bins=15, alpha=0.6, edgecolor='white', linewidth=1.5)
+
+    mean_val = float(np.average(sentiments, weights=weights)) if mean is None else float(mean)
     plt.axvline(mean_val, color='#d62728', linestyle='--', linewidth=3, label=f"Mean: {mean_val:.2f}")
-    
+
     plt.title('Expert Sentiment Distribution', fontsize=22, fontweight='bold', pad=20)
     plt.xlabel('Sentiment Polarity', fontsize=18)
     plt.ylabel('Frequency', fontsize=18)
     plt.legend(fontsize=16)
     plt.grid(True, alpha=0.3)
     plt.tight_layout()
-    plt.savefig('expert_sentiment_distribution.pdf', dpi=300, format='pdf')
-
-    # --- 定义网络绘图函数 (超级大字版) ---
-    def draw_professional_network(G, filename, title):
-        if not G: return
-        # 【关键】设置非常大的画布，保证文字不拥挤
-        plt.figure(figsize=(16, 14))
-        
-        # 【关键】布局算法 k值调大(0.6-0.8)，拉开节点距离
-        pos = nx.spring_layout(G, k=0.7, iterations=60, seed=42)
-        
-        centrality = nx.get_node_attributes(G, 'centrality')
-        communities = nx.get_node_attributes(G, 'community')
-        weights = [G[u][v]['weight'] for u, v in G.edges()]
-        
-        # 节点更大
-        node_sizes = [v * 12000 + 1000 for v in centrality.values()] 
-        node_colors = [communities.get(n, 0) for n in G.nodes()]
-        
-        # 边更粗
-        if weights:
-            max_w = max(weights)
-            widths = [(w / max_w) * 4 + 0.5 for w in weights]
-        else: widths = 2.0
-
-        # 绘制
-        nx.draw_networkx_edges(G, pos, width=widths, alpha=0.25, edge_color='#555555')
-        # 使用Pastel配色让文字更清晰
-        nx.draw_networkx_nodes(G, pos, node_size=node_sizes, node_color=node_colors, cmap=plt.cm.Pastel1, alpha=0.95, linewidths=2, edgecolors='white')
-        
-        # 【核心修改】标签超级大，加粗，加背景框
-        labels = nx.draw_networkx_labels(G, pos, font_size=18, font_family='sans-serif', font_weight='bold', font_color='#333333')
-        
-        # 给每个标签加白色半透明背景框，防止被线条干扰
-        for _, t in labels.items():
-            t.set_bbox(dict(facecolor='white', alpha=0.6, edgecolor='none', boxstyle='round,pad=0.2'))
-
-        plt.title(title, fontsize=24, fontweight='bold', pad=30)
-        plt.axis('off')
-        plt.tight_layout()
-        plt.savefig(filename, dpi=300, format='pdf')
+    plt.savefig(filename, dpi=300, format='pdf')
+
+# --- 定义网络绘图函数 (超级大字版) ---
+@stage('layout')
+def network_layout(G):
+    # 【关键】布局算法 k值调大(0.6-0.8)，拉开节点距离
+    return nx.spring_layout(G, k=0.7, iterations=60, seed=42)
+
+def draw_professional_network(G, filename, title, pos=None):
+    """pos 为预先计算的节点布局 (不传则现算)"""
+    if not G: return
+    if pos is None:
+        pos = network_layout(G)
+    _render_network(G, filename, title, pos)
+
+@stage('render')
+def _render_network(G, filename, title, pos):
+    # 【关键】设置非常大的画布，保证文字不拥挤
+    plt.figure(figsize=(16, 14))
+
+    centrality = nx.get_node_attributes(G, 'centrality')
+    communities = nx.get_node_attributes(G, 'community')
+    weights = [G[u][v]['weight'] for u, v in G.edges()]
+
+    # 节点更大
+    node_sizes = [v * 12000 + 1000 for v in centrality.values()]
+    node_colors = [communities.get(n, 0) for n in G.nodes()]
+
+    # 边更粗
+    if weights:
+        max_w = max(weights)
+        widths = [(w / max_w) * 4 + 0.5 for w in weights]
+    else: widths = 2.0
+
+    # 绘制
+    nx.draw_networkx_edges(G, pos, width=widths, alpha=0.25, edge_color='#555555')
+    # 使用Pastel配色让文字更清晰
+    nx.draw_networkx_nodes(G, pos, node_size=node_sizes, node_color=node_colors, cmap=plt.cm.Pastel1, alpha=0.95, linewidths=2, edgecolors='white')
+
+    # 【核心修改】标签超级大，加粗，加背景框
+    labels = nx.draw_networkx_labels(G, pos, font_size=18, font_family='sans-serif', font_weight='bold', font_color='#333333')
+
+    # 给每个标签加白色半透明背景框，防止被线条干扰
+    for _, t in labels.items():
+        t.set_bbox(dict(facecolor='white', alpha=0.6, edgecolor='none', boxstyle='round,pad=0.2'))
+
+    plt.title(title, fontsize=24, fontweight='bold', pad=30)
+    plt.axis('off')
+    plt.tight_layout()
+    plt.savefig(filename, dpi=300, format='pdf')
+
+def main():
+    ap = argparse.ArgumentParser(description='语料情感与语义网络分析')
+    ap.add_argument('--chunksize', type=int, default=None,
+                    help='分块流式处理，每块行数 (语料大于内存时使用；只读CSV，不能与 --store/--since 同用)')
+    ap.add_argument('--store', default=None, help='从统一语料库 (corpus_store.py) 读取，而不是读CSV')
+    ap.add_argument('--since', default=None, help='配合 --store：只读取该日期之后的媒体/智库文档')
+    profiling.add_arguments(ap)
+    args = ap.parse_args()
+    if args.chunksize and (args.store or args.since):
+        # 流式路径直接分块读取CSV，不支持语料库/日期筛选
+        ap.error('--chunksize 不能与 --store/--since 同时使用')
+    profiling.configure_from_args(args)
+    setup_plot_style()
+
+    print(">>> 正在处理数据...")
+    if args.chunksize:
+        # 流式路径：内存上限由 chunksize 决定
+        media_series, media_band = stream_monthly_sentiment(MEDIA_FILE, chunksize=args.chunksize)
+        think_series, think_band = stream_monthly_sentiment(THINK_TANK_FILE, chunksize=args.chunksize)
+        expert_sentiment, expert_weights, expert_mean = stream_sentiment_histogram(EXPERT_FILE, chunksize=args.chunksize)
+        G_think = stream_network(THINK_TANK_FILE, top_n=30, chunksize=args.chunksize)
+        G_expert = stream_network(EXPERT_FILE, top_n=35, chunksize=args.chunksize)
+    else:
+        df_media, df_think, df_expert = load_and_clean_data(args.store, args.since)
+        if df_media is None:
+            print("无法运行绘图，请检查数据文件。")
+            return
+
+        # 预处理 (词元语料与 df 通过 doc_id 对齐)
+        tokens_media, tokens_think, tokens_expert = [featurize(df) for df in [df_media, df_think, df_expert]]
+
+        df_media = process_dates(df_media, 'Date')
+        df_think = process_dates(df_think, 'Date')
+
+        media_series = df_media.set_index('dt_date').resample(MONTH_FREQ)['sentiment'].mean()
+        think_series = df_think.set_index('dt_date').resample(MONTH_FREQ)['sentiment'].mean()
+        with stage('bootstrap'):
+            media_band = monthly_bands(df_media).reindex(media_series.index)
+            think_band = monthly_bands(df_think).reindex(think_series.index)
+        expert_sentiment, expert_weights, expert_mean = df_expert['sentiment'], None, None
+
+        # 文档-词项矩阵只构建一次，网络与关键词复用
+        dtm_think = corpus_dtm('think_tank', df_think, tokens_think)
+        dtm_expert = corpus_dtm('expert', df_expert, tokens_expert)
+        G_think = build_advanced_network(df_think, top_n=30, dtm=dtm_think) # 仅显示Top30词，保证清晰
+        G_expert = build_advanced_network(df_expert, top_n=35, dtm=dtm_expert) # 专家词汇较散，稍微多一点
+
+        print(">>> 关键词 (TF-IDF Top10)...")
+        print("   智库:", ', '.join(dtm_think.keywords(10).index))
+        print("   专家:", ', '.join(dtm_expert.keywords(10).index))
+
+        # 各来源最新月份的新兴词 (增量词频 + 突发检测)
+        trends = TermTrends(freq='M')
+        trends.update(df_media, corpus_tokens(df_media, tokens_media))
+        trends.update(df_think, corpus_tokens(df_think, tokens_think))
+        print(">>> 新兴词 (各来源最新月份, z分数 Top5)...")
+        for (source, bucket), top in trends.emerging(top_k=5).groupby(['source', 'bucket']):
+            print(f"   {source} {bucket:%Y-%m}:", ', '.join(top['term']))
+
+        # 实体/政策术语：一遍扫描标注，统计提及文档的情感与共同提及
+        print(">>> 实体情感与共同提及 (Top5)...")
+        for label, df in [('媒体', df_media), ('智库', df_think)]:
+            with stage('entities'):
+                hits = tag_corpus(df['Content'])
+            top = entity_sentiment(hits, df['sentiment']).head(5).reset_index()
+            print(f"   {label}:", ', '.join(f"{r.entity}({r.docs}篇, {r.mean_sentiment:+.3f})" for r in top.itertuples()))
+            pairs = co_mentions(hits).head(3)
+            print(f"   {label}共同提及:", ', '.join(f"{r.entity_a}+{r.entity_b}({r.docs})" for r in pairs.itertuples()))
+
+    # --- 图表 1: 情感演化趋势 (大字版) ---
+    print(">>> 生成图表 1: 情感演化趋势 (sentiment_evolution_2025.pdf)...")
+    plot_sentiment_evolution(media_series, think_series, 'sentiment_evolution_2025.pdf', media_band, think_band)
+
+    # --- 图表 2: 专家情感分布 (大字版) ---
+    print(">>> 生成图表 2: 专家情感分布 (expert_sentiment_distribution.pdf)...")
+    plot_expert_distribution(expert_sentiment, 'expert_sentiment_distribution.pdf', expert_weights, expert_mean)
 
     # --- 图表 3 & 4: 生成网络图 ---
     print(">>> 生成图表 3 & 4: 专业语义网络 (高清大字版)...")
-    
-    # 智库网络
-    G_think = build_advanced_network(df_think, top_n=30) # 仅显示Top30词，保证清晰
     draw_professional_network(G_think, 'network_think_tank_pro.pdf', 'Think Tank Semantic Network')
-
-    # 专家网络
-    G_expert = build_advanced_network(df_expert, top_n=35) # 专家词汇较散，稍微多一点
     draw_professional_network(G_expert, 'network_expert_pro.pdf', 'Expert Semantic Network')
 
     print("\n>>> 全部完成！生成的PDF图表已优化字体大小，可直接插入LaTeX。")
-else:
-    print("无法运行绘图，请检查数据文件。")
\ No newline at end of file
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+分析流程规模基准测试
+
+用法:
+    python benchmark.py --scales 1 10 100                 # 生成 1x/10x/100x 合成语料并逐阶段计时
+    python benchmark.py --corpus media --scales 10 -o bench_report.json
+    python benchmark.py --scales 10 --baseline bench_report.json --threshold 1.3
+                                                          # 回归模式: 任一阶段变慢超过阈值则退出码为1
+
+合成语料按 data/*.csv 的字段结构与文本统计生成: 文档长度从真实长度分布中抽样,
+词语按真实词频抽样 (保留大小写和标点, 让 clean_text 的工作量接近真实),
+来源与日期字符串从真实取值中抽样 (保留多种日期格式)。
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import analysis
+from token_corpus import TokenCorpus
+
+CORPUS_FILES = {
+    'media': analysis.MEDIA_FILE,
+    'think_tank': analysis.THINK_TANK_FILE,
+    'expert': analysis.EXPERT_FILE,
+}
+STAGES = ['clean_text', 'sentiment', 'process_dates', 'network', 'layout', 'render']
+DEFAULT_REPORT = 'bench_report.json'
+REGRESSION_REPORT = 'bench_regression.json'
+# 低于该耗时的阶段不参与回归判断 (计时噪声过大)
+MIN_SECONDS = 0.05
+
+# ============================
+# 1. 合成语料生成
+# ============================
+
+class CorpusModel:
+    """从一份真实语料中拟合的文本统计"""
+
+    def __init__(self, df):
+        self.columns = list(df.columns)
+        tokens = [str(t).split() for t in df['Content'].fillna('')]
+        self.lengths = np.array([max(len(t), 1) for t in tokens])
+        counts = Counter(w for doc in tokens for w in doc)
+        self.vocab = np.array(list(counts.keys()), dtype=object)
+        freq = np.array(list(counts.values()), dtype=float)
+        self.probs = freq / freq.sum()
+        self.column_values = {c: df[c].dropna().astype(str).to_numpy()
+                              for c in df.columns if c != 'Content'}
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls(pd.read_csv(path, dtype=str))
+
+    def generate(self, n_docs, seed=42):
+        """生成 n_docs 篇与原语料字段相同的合成文档"""
+        rng = np.random.default_rng(seed)
+        lengths = rng.choice(self.lengths, size=n_docs)
+        words = rng.choice(self.vocab, size=int(lengths.sum()), p=self.probs)
+        bounds = np.concatenate([[0], np.cumsum(lengths)])
+        data = {}
+        for col in self.columns:
+            if col == 'Content':
+                data[col] = [' '.join(words[bounds[i]:bounds[i + 1]]) for i in range(n_docs)]
+            elif len(self.column_values[col]):
+                data[col] = rng.choice(self.column_values[col], size=n_docs)
+            else:
+                data[col] = [''] * n_docs
+        return pd.DataFrame(data, columns=self.columns)
+
+# ============================
+# 2. 分阶段执行
+# ============================
+
+def run_stages(df, workdir):
+    """返回按顺序执行的 (阶段名, 函数) 列表，各阶段共享中间结果，以便外部逐个计时"""
+    state = {'df': df}
+
+    def clean():
+        state['tokens'] = TokenCorpus.from_texts(state['df']['Content'], analysis.tokenize)
+        state['df']['doc_id'] = np.arange(len(state['df']))
+
+    def sentiment():
+        state['df']['sentiment'] = state['df']['Content'].apply(analysis.get_sentiment)
+
+    def dates():
+        state['df'] = analysis.process_dates(state['df'], 'Date')
+
+    def network():
+        state['G'] = analysis.build_advanced_network(state['df'], top_n=30, tokens=state['tokens'])
+
+    def layout():
+        state['pos'] = analysis.network_layout(state['G']) if state['G'] else None
+
+    def render():
+        # 复用 layout 阶段的布局，本阶段只计绘制耗时
+        analysis.draw_professional_network(state['G'], os.path.join(workdir, 'network.pdf'), 'Benchmark Network',
+                                           pos=state['pos'])
+        analysis.plt.close('all')
+
+    return [('clean_text', clean), ('sentiment', sentiment), ('process_dates', dates),
+            ('network', network), ('layout', layout), ('render', render)]
+
+def time_stages(df, workdir):
+    timings = {}
+    for name, fn in run_stages(df.copy(), workdir):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings[name] = time.perf_counter() - start
+    return timings
+
+def memory_stages(df, workdir):
+    """单独一遍用 tracemalloc 统计各阶段峰值内存 (tracemalloc 会拖慢执行，不与计时混用)"""
+    peaks = {}
+    tracemalloc.start()
+    try:
+        for name, fn in run_stages(df.copy(), workdir):
+            gc.collect()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            fn()
+            peaks[name] = (tracemalloc.get_traced_memory()[1] - base) / 2 ** 20
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+def benchmark(corpus, scales, seed=42, memory=True):
+    model = CorpusModel.from_csv(CORPUS_FILES[corpus])
+    base_docs = len(model.lengths)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in scales:
+            n_docs = int(base_docs * scale)
+            df = model.generate(n_docs, seed=seed)
+            print(f"[{corpus} x{scale}] {n_docs} 篇合成文档")
+            timings = time_stages(df, workdir)
+            peaks = memory_stages(df, workdir) if memory else {}
+            for stage in STAGES:
+                results.append({
+                    'corpus': corpus,
+                    'scale': scale,
+                    'n_docs': n_docs,
+                    'stage': stage,
+                    'seconds': round(timings[stage], 4),
+                    'peak_mb': round(peaks[stage], 2) if stage in peaks else None,
+                })
+                mem = f", 峰值 {peaks[stage]:.1f} MB" if stage in peaks else ''
+                print(f"   {stage:<14} {timings[stage]:8.3f}s{mem}")
+    return results
+
+# ============================
+# 3. 报告与回归判断
+# ============================
+
+def make_report(results, seed):
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+def find_regressions(report, baseline, threshold):
+    """对比基线报告，返回变慢超过阈值的阶段"""
+    key = lambda r: (r['corpus'], r['scale'], r['stage'])
+    old = {key(r): r for r in baseline['results']}
+    regressions = []
+    for r in report['results']:
+        prev = old.get(key(r))
+        if not prev or max(prev['seconds'], r['seconds']) < MIN_SECONDS:
+            continue
+        ratio = r['seconds'] / max(prev['seconds'], 1e-9)
+        if ratio > threshold:
+            regressions.append({**r, 'baseline_seconds': prev['seconds'], 'ratio': round(ratio, 2)})
+    return regressions
+
+def main():
+    ap = argparse.ArgumentParser(description='合成语料规模基准测试')
+    ap.add_argument('--corpus', choices=list(CORPUS_FILES), default='think_tank', help='以哪份语料为模板')
+    ap.add_argument('--scales', type=float, nargs='+', default=[1, 10], help='相对原语料的规模倍数')
+    ap.add_argument('--seed', type=int, default=42)
+    ap.add_argument('--no-memory', action='store_true', help='跳过 tracemalloc 内存统计')
+    ap.add_argument('-o', '--output', default=None,
+                    help=f'JSON 报告路径 (默认 {DEFAULT_REPORT}，回归模式默认 {REGRESSION_REPORT})')
+    ap.add_argument('--baseline', default=None, help='回归模式: 与该基线报告对比')
+    ap.add_argument('--threshold', type=float, default=1.25, help='回归阈值 (耗时/基线)')
+    args = ap.parse_args()
+    analysis.setup_plot_style()   # 渲染阶段与 analysis.py 使用同样的插图风格
+
+    results = benchmark(args.corpus, args.scales, seed=args.seed, memory=not args.no_memory)
+    report = make_report(results, args.seed)
+
+    output = args.output or (REGRESSION_REPORT if args.baseline else DEFAULT_REPORT)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.threshold)
+        report['regressions'] = regressions
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n报告已保存: {output}")
+
+    if args.baseline:
+        if report['regressions']:
+            print(f"[Fail] {len(report['regressions'])} 个阶段变慢超过 {args.threshold}x:")
+            for r in report['regressions']:
+                print(f"   {r['corpus']} x{r['scale']} {r['stage']}: {r['baseline_seconds']}s -> {r['seconds']}s ({r['ratio']}x)")
+            return 1
+        print("[OK] 未发现性能回归")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
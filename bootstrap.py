@@ -0,0 +1,129 @@
+"""
+分组均值的向量化自助法 (bootstrap) 置信区间
+
+泊松自助法：每次重抽样中每篇文档的权重取 Poisson(1)，与有放回重抽样渐近等价，
+但各文档的权重相互独立，因此可以按文档分块累加、与分块流式读取配合。
+每块生成一个 (重抽样次数 x 文档数) 的权重矩阵 (16 位随机数查逆 CDF 表，比 rng.poisson 快数倍)，
+按组排序后用 np.add.reduceat
+一次求出所有 (组, 重抽样) 的加权和，没有逐次重抽样的 Python 循环；
+内存只与 block 大小有关，可扩展到百万级文档、数千次重抽样。
+随机种子固定，同样的数据与分块方式结果可复现。
+样本数少于 MIN_N 的组 (如只有几篇文档的月份) 重抽样均值只有寥寥几种取值 (单篇时恒等于样本值)，
+区间没有意义，这些组的 se / lo / hi 置为 NaN，由调用方据 n 列另行标注。
+
+    boot = BootstrapMeans(n_boot=1000, seed=42)
+    for chunk in chunks:
+        boot.update(chunk['sentiment'], time_bucket(chunk['dt_date']))
+    boot.result(alpha=0.05)        # 每组一行: n / mean / se / lo / hi (n < MIN_N 时区间为 NaN)
+"""
+import math
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from grouped_stats import time_bucket
+
+N_BOOT = 1000
+SEED = 42
+# 少于该样本数的组不给出置信区间 (2 篇只有 3 种重抽样均值，5 篇起区间才有参考价值)
+MIN_N = 5
+# 每块权重矩阵的元素个数上限 (约 32MB)
+BLOCK_ELEMENTS = 4_000_000
+
+def _poisson_table(bits=16):
+    """Poisson(1) 的逆 CDF 查找表：均匀的 bits 位整数 -> 权重"""
+    cdf = np.cumsum([math.exp(-1) / math.factorial(k) for k in range(20)])
+    u = (np.arange(2 ** bits) + 0.5) / 2 ** bits
+    return np.searchsorted(cdf, u).astype(np.float32)
+
+POISSON_TABLE = _poisson_table()
+
+class BootstrapMeans:
+    """按组累加 n_boot 次泊松重抽样的加权和，可分块更新"""
+
+    def __init__(self, n_boot=N_BOOT, seed=SEED, block_elements=BLOCK_ELEMENTS):
+        self.n_boot = n_boot
+        self.rng = np.random.default_rng(seed)
+        self.block = max(1, block_elements // n_boot)
+        self.keys = []
+        self._index = {}
+        self.n = np.zeros(0)
+        self.total = np.zeros(0)
+        self.wsum = np.zeros((n_boot, 0))    # 每次重抽样各组的权重和
+        self.wvsum = np.zeros((n_boot, 0))   # 每次重抽样各组的加权值和
+
+    def _codes(self, keys):
+        codes = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            g = self._index.get(key)
+            if g is None:
+                g = self._index[key] = len(self.keys)
+                self.keys.append(key)
+            codes[i] = g
+        grow = len(self.keys) - len(self.n)
+        if grow:
+            self.n = np.pad(self.n, (0, grow))
+            self.total = np.pad(self.total, (0, grow))
+            self.wsum = np.pad(self.wsum, ((0, 0), (0, grow)))
+            self.wvsum = np.pad(self.wvsum, ((0, 0), (0, grow)))
+        return codes
+
+    def update(self, values, keys):
+        """加入一批 (值, 组标签)；值为 NaN 或组标签缺失的行跳过"""
+        values = np.asarray(values, dtype=float)
+        keys = pd.Series(keys).to_numpy(dtype=object)
+        keep = ~np.isnan(values) & ~pd.isna(keys)
+        values, keys = values[keep], keys[keep]
+        if not len(values):
+            return self
+
+        # 按组排序后，各组是连续的一段，reduceat 一次求和
+        inverse, uniq = pd.factorize(keys)
+        codes = self._codes(list(uniq))[inverse]
+        order = np.argsort(codes, kind='stable')
+        codes, values = codes[order], values[order]
+        np.add.at(self.n, codes, 1)
+        np.add.at(self.total, codes, values)
+
+        for start in range(0, len(values), self.block):
+            c = codes[start:start + self.block]
+            v = values[start:start + self.block]
+            starts = np.flatnonzero(np.r_[True, c[1:] != c[:-1]])
+            groups = c[starts]
+            w = POISSON_TABLE[self.rng.integers(0, len(POISSON_TABLE), (self.n_boot, len(v)), dtype=np.uint16)]
+            self.wsum[:, groups] += np.add.reduceat(w, starts, axis=1)
+            w *= v.astype(np.float32)
+            self.wvsum[:, groups] += np.add.reduceat(w, starts, axis=1)
+        return self
+
+    def replicates(self):
+        """(重抽样次数 x 组数) 的重抽样均值矩阵；某次重抽样中组权重全为 0 时为 NaN"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.wsum > 0, self.wvsum / self.wsum, np.nan)
+
+    def result(self, alpha=0.05, min_n=MIN_N):
+        """每组的样本均值、自助标准误与百分位置信区间；样本数少于 min_n 的组区间为 NaN"""
+        reps = self.replicates()
+        index = pd.Index(self.keys, name='group')
+        if not len(index):
+            return pd.DataFrame(columns=['n', 'mean', 'se', 'lo', 'hi'], index=index)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)   # 全为 NaN 的组
+            lo, hi = np.nanquantile(reps, [alpha / 2, 1 - alpha / 2], axis=0)
+            se = np.nanstd(reps, axis=0, ddof=1)
+        mean = self.total / self.n
+        sparse = self.n < min_n
+        se[sparse] = lo[sparse] = hi[sparse] = np.nan
+        return pd.DataFrame({'n': self.n.astype(int), 'mean': mean, 'se': se, 'lo': lo, 'hi': hi}, index=index)
+
+def bootstrap_ci(values, keys, n_boot=N_BOOT, alpha=0.05, seed=SEED, min_n=MIN_N):
+    """一次性计算各组均值的自助法置信区间"""
+    return BootstrapMeans(n_boot, seed).update(values, keys).result(alpha, min_n).sort_index()
+
+def monthly_bands(df, date_col='dt_date', value_col='sentiment', freq='M',
+                  n_boot=N_BOOT, alpha=0.05, seed=SEED, min_n=MIN_N):
+    """按时间桶 (与 resample('ME') 标签一致) 计算均值置信带，索引为时间桶"""
+    bands = bootstrap_ci(df[value_col], time_bucket(df[date_col], freq), n_boot, alpha, seed, min_n)
+    bands.index = pd.DatetimeIndex(bands.index, name=date_col)
+    return bands
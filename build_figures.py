@@ -0,0 +1,229 @@
+"""
+论文图表增量构建脚本
+
+用法:
+    python build_figures.py              # 只重绘过期的图表
+    python build_figures.py 3_4 3_5      # 只构建指定脚本
+    python build_figures.py --force -j 4 # 强制全部重绘, 4 个进程并行
+
+每个 visualization/*.py 视为一个图表定义。脚本的输出文件通过静态分析
+savefig(...) 的参数得到; 依赖的数据文件可在脚本顶层用 FIGURE_INPUTS = [...]
+声明 (相对仓库根目录)。脚本 (递归) 导入的仓库内模块由静态分析自动收集。
+指纹 = 脚本源码 + 导入的仓库模块 + 输入文件内容 + matplotlib 版本,
+指纹未变且输出齐全的图表直接跳过。
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# --- 配置 ---
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIGURE_DIR = os.path.join(ROOT_DIR, 'visualization')
+OUTPUT_DIR = os.path.join(ROOT_DIR, 'figures')
+STATE_FILE = '.build_state.json'
+
+# ============================
+# 1. 图表发现 (静态分析, 不执行脚本)
+# ============================
+
+def _literal_assignments(tree):
+    """收集模块顶层的 `name = 常量` 赋值"""
+    values = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            try:
+                values[node.targets[0].id] = ast.literal_eval(node.value)
+            except ValueError:
+                pass
+    return values
+
+def _savefig_targets(tree, constants):
+    """找出所有 savefig(...) 调用的第一个参数 (字面量或顶层常量)"""
+    outputs = []
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr == 'savefig' and node.args):
+            continue
+        arg = node.args[0]
+        if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+            outputs.append(arg.value)
+        elif isinstance(arg, ast.Name) and isinstance(constants.get(arg.id), str):
+            outputs.append(constants[arg.id])
+    return list(dict.fromkeys(outputs))
+
+def _imported_names(tree):
+    """脚本中所有 import 语句 (含函数内) 引用的顶层模块名"""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+    return names
+
+def local_modules(tree, root_dir=ROOT_DIR):
+    """递归收集导入的仓库根目录模块 (root_dir/<name>.py)，返回路径列表"""
+    found = {}
+    pending = [tree]
+    while pending:
+        for name in _imported_names(pending.pop()):
+            path = os.path.join(root_dir, f'{name}.py')
+            if name in found or not os.path.exists(path):
+                continue
+            found[name] = path
+            with open(path, 'r', encoding='utf-8') as f:
+                pending.append(ast.parse(f.read(), filename=path))
+    return sorted(found.values())
+
+def discover_figures(figure_dir=FIGURE_DIR):
+    """返回 {图表名: {'script', 'outputs', 'inputs', 'modules'}}"""
+    figures = {}
+    for fname in sorted(os.listdir(figure_dir)):
+        if not fname.endswith('.py') or fname.startswith('_'):
+            continue
+        path = os.path.join(figure_dir, fname)
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+        constants = _literal_assignments(tree)
+        outputs = _savefig_targets(tree, constants)
+        if not outputs:
+            continue
+        figures[fname[:-3]] = {
+            'script': path,
+            'outputs': outputs,
+            'inputs': [os.path.join(ROOT_DIR, p) for p in constants.get('FIGURE_INPUTS', [])],
+            'modules': local_modules(tree),
+        }
+    return figures
+
+# ============================
+# 2. 指纹与增量判断
+# ============================
+
+def _hash_file(h, path):
+    h.update(os.path.relpath(path, ROOT_DIR).encode('utf-8'))
+    if not os.path.exists(path):
+        h.update(b'<missing>')
+        return
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+
+def fingerprint(figure):
+    """脚本源码 + 导入的仓库模块 + 输入文件 + matplotlib 版本"""
+    import matplotlib
+    h = hashlib.sha256()
+    h.update(matplotlib.__version__.encode('utf-8'))
+    for path in [figure['script']] + sorted(set(figure['modules']) | set(figure['inputs'])):
+        _hash_file(h, path)
+    return h.hexdigest()
+
+def load_state(output_dir):
+    path = os.path.join(output_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_state(output_dir, state):
+    path = os.path.join(output_dir, STATE_FILE)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+def is_up_to_date(name, figure, digest, state, output_dir):
+    if state.get(name) != digest:
+        return False
+    return all(os.path.exists(os.path.join(output_dir, o)) for o in figure['outputs'])
+
+# ============================
+# 3. 渲染 (子进程, Agg 无界面后端)
+# ============================
+
+def render_figure(script, output_dir):
+    """在独立子进程中执行一个图表脚本, 输出写到 output_dir"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import runpy
+    import warnings
+    import matplotlib.pyplot as plt
+
+    warnings.filterwarnings('ignore')
+    os.chdir(output_dir)
+    start = time.perf_counter()
+    try:
+        runpy.run_path(script, run_name='__main__')
+    except SystemExit as e:
+        # 脚本调用 sys.exit(非0) 时按失败上报，而不是让整个构建退出
+        if e.code not in (None, 0):
+            raise RuntimeError(f"脚本以 sys.exit({e.code!r}) 退出") from None
+    finally:
+        plt.close('all')
+    return time.perf_counter() - start
+
+def build(names=None, force=False, jobs=None, output_dir=OUTPUT_DIR):
+    figures = discover_figures()
+    if names:
+        unknown = [n for n in names if n not in figures]
+        if unknown:
+            raise SystemExit(f"错误: 未找到图表 {', '.join(unknown)}")
+        figures = {n: figures[n] for n in names}
+
+    os.makedirs(output_dir, exist_ok=True)
+    state = load_state(output_dir)
+
+    stale = {}
+    for name, figure in figures.items():
+        digest = fingerprint(figure)
+        if not force and is_up_to_date(name, figure, digest, state, output_dir):
+            print(f"[Skip] {name}: 已是最新")
+        else:
+            stale[name] = digest
+
+    if not stale:
+        print("所有图表均为最新。")
+        return 0
+
+    failed = 0
+    # 每个任务使用全新进程, 避免各脚本的 rcParams 互相污染
+    with ProcessPoolExecutor(max_workers=jobs, max_tasks_per_child=1) as pool:
+        futures = {pool.submit(render_figure, figures[n]['script'], output_dir): n for n in stale}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                elapsed = future.result()
+            except Exception as e:
+                failed += 1
+                state.pop(name, None)
+                print(f"[Error] {name}: {e}")
+                continue
+            state[name] = stale[name]
+            print(f"[Done] {name} ({elapsed:.1f}s) -> {', '.join(figures[name]['outputs'])}")
+
+    save_state(output_dir, state)
+    return 1 if failed else 0
+
+def main():
+    ap = argparse.ArgumentParser(description='增量、并行地构建 visualization/ 下的论文图表')
+    ap.add_argument('names', nargs='*', help='只构建指定图表 (如 3_4), 默认全部')
+    ap.add_argument('-f', '--force', action='store_true', help='忽略指纹, 全部重绘')
+    ap.add_argument('-j', '--jobs', type=int, default=None, help='并行进程数 (默认 CPU 核数)')
+    ap.add_argument('-o', '--output-dir', default=OUTPUT_DIR, help='输出目录')
+    ap.add_argument('--list', action='store_true', help='只列出发现的图表')
+    args = ap.parse_args()
+
+    if args.list:
+        for name, figure in discover_figures().items():
+            print(f"{name}: {', '.join(figure['outputs'])}")
+        return 0
+    return build(args.names, force=args.force, jobs=args.jobs,
+                 output_dir=os.path.abspath(args.output_dir))
+
+if __name__ == "__main__":
+    sys.exit(main())
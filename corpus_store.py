@@ -0,0 +1,245 @@
+"""
+统一语料库 (SQLite, WAL 模式)
+
+三份数据的字段各不相同 (媒体/智库: Source/Title/Date/URL/Content; 专家: Source/Name/Content;
+爬虫输出: 来源/Title/Date/URL/Content)，这里统一成一张带类型的 documents 表，
+按来源、日期、URL、内容哈希建索引。爬虫批量事务写入，分析脚本按条件读取切片。
+同一语料内内容相同的文档只保留一份 (不同语料之间互不影响；空正文不参与去重)。
+
+    python corpus_store.py import     # 把 data/*.csv 导入语料库 (重复内容自动跳过)
+    python corpus_store.py stats      # 各语料/来源的文档数
+
+    store = CorpusStore()
+    df = store.read_frame(corpus='media', start='2025-01-01', columns=['Date', 'Content'])
+"""
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import time
+
+import pandas as pd
+
+# --- 配置 ---
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_FILE = os.path.join(ROOT_DIR, 'data', 'corpus.db')
+BATCH_SIZE = 500
+# 夹在文字中的日期: 'Published March 27, 2025' / 'July, 14, 2025' / 'Transcript — Jan. 14, 2025'
+DATE_IN_TEXT_RE = re.compile(r'([A-Za-z]{3,9})\.?,?\s+(\d{1,2}),?\s+(\d{4})')
+
+CORPORA = {
+    'media': os.path.join(ROOT_DIR, 'data', 'us_mainstream_media_data.csv'),
+    'think_tank': os.path.join(ROOT_DIR, 'data', 'us_think_tank_data.csv'),
+    'expert': os.path.join(ROOT_DIR, 'data', 'us_experts_twitter_data.csv'),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id           INTEGER PRIMARY KEY,
+    corpus       TEXT NOT NULL,
+    source       TEXT,
+    author       TEXT,
+    title        TEXT,
+    date_raw     TEXT,
+    date         TEXT,
+    url          TEXT,
+    content      TEXT NOT NULL,
+    content_hash TEXT,                -- 空正文为 NULL (不去重)
+    added_at     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_corpus_source ON documents(corpus, source);
+CREATE INDEX IF NOT EXISTS idx_documents_date ON documents(date);
+CREATE INDEX IF NOT EXISTS idx_documents_url ON documents(url);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_documents_corpus_hash ON documents(corpus, content_hash);
+"""
+
+# 表字段 -> 原CSV列名 (读出时还原，分析代码无需改动)
+COLUMN_MAP = {
+    'source': 'Source',
+    'author': 'Name',
+    'title': 'Title',
+    'date_raw': 'Date',
+    'url': 'URL',
+    'content': 'Content',
+}
+# 原CSV/爬虫列名 -> 表字段
+INPUT_MAP = {v: k for k, v in COLUMN_MAP.items()}
+INPUT_MAP['来源'] = 'source'
+
+INSERT_SQL = """
+INSERT OR IGNORE INTO documents
+    (corpus, source, author, title, date_raw, date, url, content, content_hash, added_at)
+VALUES
+    (:corpus, :source, :author, :title, :date_raw, :date, :url, :content, :content_hash, :added_at)
+"""
+
+def content_hash(text):
+    """正文哈希；空正文返回 None (NULL 不受唯一索引约束，每篇都保留)"""
+    if not text:
+        return None
+    return hashlib.sha1(str(text).encode('utf-8')).hexdigest()
+
+def _parse_dates(raw):
+    try:
+        return pd.to_datetime(raw, utc=True, errors='coerce', format='mixed')
+    except (TypeError, ValueError):
+        return pd.to_datetime(raw, utc=True, errors='coerce')
+
+def normalize_dates(values):
+    """原始日期字符串 -> 'YYYY-MM-DD HH:MM:SS' (UTC，无法解析时为 None)
+    整串无法解析时再从文本中提取 "March 27, 2025" 形式的日期 (如 'Published March 27, 2025')"""
+    raw = pd.Series(values, dtype=object).astype(str).reset_index(drop=True)
+    out = [None if pd.isna(d) else d.strftime('%Y-%m-%d %H:%M:%S') for d in _parse_dates(raw)]
+    missing = [i for i, d in enumerate(out) if d is None]
+    if missing:
+        parts = raw.iloc[missing].str.extract(DATE_IN_TEXT_RE).dropna()
+        if len(parts):
+            retry = _parse_dates(parts[0] + ' ' + parts[1] + ' ' + parts[2])
+            for i, d in zip(parts.index, retry):
+                if not pd.isna(d):
+                    out[i] = d.strftime('%Y-%m-%d %H:%M:%S')
+    return out
+
+def _clean(value):
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    return str(value)
+
+# ============================
+# 1. 语料库
+# ============================
+
+class CorpusStore:
+    """统一语料库，支持批量写入与条件读取"""
+
+    def __init__(self, path=STORE_FILE, timeout=30):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=timeout)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- 写入 ---
+
+    def prepare_rows(self, rows, corpus):
+        """把 CSV/爬虫格式的字典转换为表记录"""
+        rows = list(rows)
+        dates = normalize_dates([r.get('Date') for r in rows])
+        now = time.time()
+        records = []
+        for row, date in zip(rows, dates):
+            rec = {field: None for field in COLUMN_MAP}
+            for key, value in row.items():
+                if key in INPUT_MAP:
+                    rec[INPUT_MAP[key]] = _clean(value)
+            rec['content'] = rec['content'] or ''
+            rec.update(corpus=row.get('corpus', corpus), date=date,
+                       content_hash=content_hash(rec['content']), added_at=now)
+            records.append(rec)
+        return records
+
+    def insert_rows(self, rows, corpus=None, conn=None):
+        """批量写入 (每批一个事务)，同一语料内内容重复的文档跳过
+        返回 (新增篇数, 因重复跳过的篇数)"""
+        conn = conn or self.conn
+        rows = list(rows)
+        added = 0
+        for i in range(0, len(rows), BATCH_SIZE):
+            records = self.prepare_rows(rows[i:i + BATCH_SIZE], corpus)
+            with conn:
+                before = conn.total_changes
+                conn.executemany(INSERT_SQL, records)
+                added += conn.total_changes - before
+        return added, len(rows) - added
+
+    def import_csv(self, path, corpus, chunksize=BATCH_SIZE):
+        """分块导入一个CSV文件，返回 (新增篇数, 跳过篇数)"""
+        added = ignored = 0
+        for chunk in pd.read_csv(path, dtype=str, chunksize=chunksize):
+            a, i = self.insert_rows(chunk.to_dict('records'), corpus)
+            added += a
+            ignored += i
+        return added, ignored
+
+    # --- 读取 ---
+
+    def _query(self, corpus=None, sources=None, start=None, end=None, columns=None, after_id=None):
+        fields = ['id', 'corpus'] + [k for k, v in COLUMN_MAP.items() if columns is None or v in columns]
+        if columns is None or 'Date' in columns:
+            fields.append('date')
+        clauses, params = [], []
+        if corpus is not None:
+            clauses.append('corpus = ?'); params.append(corpus)
+        if sources:
+            sources = list(sources)
+            clauses.append(f"source IN ({','.join('?' * len(sources))})"); params.extend(sources)
+        if start is not None:
+            clauses.append('date >= ?'); params.append(str(pd.Timestamp(start)))
+        if end is not None:
+            clauses.append('date < ?'); params.append(str(pd.Timestamp(end)))
+        if after_id is not None:
+            clauses.append('id > ?'); params.append(int(after_id))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return f"SELECT {', '.join(fields)} FROM documents {where} ORDER BY id", params
+
+    def _to_frame(self, df):
+        df = df.rename(columns=COLUMN_MAP)
+        if 'Source' in df.columns:
+            df['Source'] = df['Source'].astype('category')
+        if 'Name' in df.columns:
+            df['Name'] = df['Name'].astype('category')
+        if 'Content' in df.columns:
+            df['Content'] = df['Content'].fillna('')
+        return df
+
+    def read_frame(self, corpus=None, sources=None, start=None, end=None, columns=None, after_id=None):
+        """按语料/来源/日期读取切片，列名与原CSV一致 (另附 id/corpus/date)；after_id 只读新增文档"""
+        sql, params = self._query(corpus, sources, start, end, columns, after_id)
+        return self._to_frame(pd.read_sql_query(sql, self.conn, params=params))
+
+    def iter_frames(self, corpus=None, sources=None, start=None, end=None, columns=None, chunksize=BATCH_SIZE,
+                    after_id=None):
+        """分块读取切片"""
+        sql, params = self._query(corpus, sources, start, end, columns, after_id)
+        for chunk in pd.read_sql_query(sql, self.conn, params=params, chunksize=chunksize):
+            yield self._to_frame(chunk)
+
+    def counts(self):
+        return pd.read_sql_query(
+            'SELECT corpus, source, COUNT(*) AS docs, MIN(date) AS first, MAX(date) AS last '
+            'FROM documents GROUP BY corpus, source ORDER BY corpus, source', self.conn)
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+
+def main():
+    ap = argparse.ArgumentParser(description='统一语料库')
+    ap.add_argument('--store', default=STORE_FILE, help='语料库文件路径')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    sub.add_parser('import', help='导入 data/*.csv')
+    sub.add_parser('stats', help='各语料/来源的文档数')
+    args = ap.parse_args()
+
+    with CorpusStore(args.store) as store:
+        if args.cmd == 'import':
+            for corpus, path in CORPORA.items():
+                if not os.path.exists(path):
+                    print(f"[Warn] 找不到 {path}")
+                    continue
+                added, ignored = store.import_csv(path, corpus)
+                print(f"[{corpus}] 新增 {added} 篇, 内容重复跳过 {ignored} 篇")
+        print(store.counts().to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+基于租约的抓取队列 (SQLite, 与统一语料库同一个文件)
+
+链接先入队，同一台机器上的多个抓取进程各自领取
+(SQLite WAL 依赖共享内存，数据库文件不能放在网络文件系统上供多台机器共用)：
+    - 领取时加租约 (lease_expires)，进程崩溃后租约过期，链接自动回到可领取状态
+    - 同一域名两次领取之间至少间隔一个礼貌延时 (domains.next_allowed)，进程再多也不会超速
+    - 抓取结果与 "标记完成" 在同一个事务中写入语料库，并校验租约令牌：
+      租约已过期并被他人领走的旧进程无法再提交，每个链接恰好写入一次
+
+    python crawl_queue.py enqueue data_urls.txt   # 入队 (重复链接自动跳过)
+    python crawl_queue.py stats                   # 各状态/域名的链接数
+    python crawl_queue.py retry                   # 失败的链接重新入队
+"""
+import argparse
+import os
+import random
+import socket
+import time
+import uuid
+from urllib.parse import urlparse
+
+import pandas as pd
+
+from corpus_store import INSERT_SQL, STORE_FILE, CorpusStore
+
+# --- 配置 ---
+LEASE_SECONDS = 120
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 30
+# 各域名两次请求之间的间隔 (秒，随机取值)，与单进程抓取时的延时一致
+DEFAULT_DELAY = (1, 3)
+DOMAIN_DELAYS = {
+    'politico.com': (2, 4),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl_queue (
+    id            INTEGER PRIMARY KEY,
+    url           TEXT NOT NULL UNIQUE,
+    domain        TEXT NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'pending',   -- pending / leased / done / failed
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    available_at  REAL NOT NULL DEFAULT 0,
+    lease_token   TEXT,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    doc_id        INTEGER,
+    error         TEXT,
+    updated_at    REAL
+);
+CREATE INDEX IF NOT EXISTS idx_crawl_queue_status ON crawl_queue(status, domain, available_at);
+CREATE TABLE IF NOT EXISTS crawl_domains (
+    domain       TEXT PRIMARY KEY,
+    next_allowed REAL NOT NULL DEFAULT 0
+);
+"""
+
+class LeaseLost(Exception):
+    """租约已过期或被其他进程领走"""
+
+def get_domain(url):
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+def domain_delay(domain):
+    for suffix, delay in DOMAIN_DELAYS.items():
+        if domain == suffix or domain.endswith('.' + suffix):
+            return random.uniform(*delay)
+    return random.uniform(*DEFAULT_DELAY)
+
+# ============================
+# 1. 队列
+# ============================
+
+class CrawlQueue:
+    """链接队列；与 CorpusStore 共用连接，结果与完成标记在同一事务中提交"""
+
+    def __init__(self, path=STORE_FILE, owner=None):
+        self.store = CorpusStore(path)
+        self.conn = self.store.conn
+        self.conn.executescript(SCHEMA)
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+
+    def close(self):
+        self.store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- 入队 ---
+
+    def enqueue(self, urls):
+        """入队，已存在的链接跳过，返回新增条数"""
+        now = time.time()
+        rows = [(url, get_domain(url), now) for url in dict.fromkeys(u.strip() for u in urls) if url]
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO crawl_queue (url, domain, updated_at) VALUES (?, ?, ?)', rows)
+            added = self.conn.total_changes - before
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO crawl_domains (domain) VALUES (?)', {(d,) for _, d, _ in rows})
+        return added
+
+    def retry_failed(self):
+        with self.conn:
+            return self.conn.execute(
+                "UPDATE crawl_queue SET status = 'pending', attempts = 0, available_at = 0, error = NULL "
+                "WHERE status = 'failed'").rowcount
+
+    # --- 领取 ---
+
+    def claim(self, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        """领取一条可抓取的链接 (域名已过礼貌间隔)
+        租约过期且已用完重试次数的链接 (进程反复崩溃) 标记为 failed，不再领取
+        返回 (任务, 0) 或 (None, 建议等待秒数)；队列已空时返回 (None, None)"""
+        now = time.time()
+        # BEGIN IMMEDIATE 先拿写锁，多个进程不会领到同一条
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            self.conn.execute(
+                "UPDATE crawl_queue SET status = 'failed', lease_token = NULL, lease_expires = NULL, "
+                "available_at = 0, error = COALESCE(error, '租约过期，重试次数已用完'), updated_at = :now "
+                "WHERE status = 'leased' AND lease_expires <= :now AND attempts >= :max_attempts",
+                {'now': now, 'max_attempts': max_attempts})
+            row = self.conn.execute(
+                """
+                SELECT q.id, q.url, q.domain, q.attempts FROM crawl_queue q
+                JOIN crawl_domains d ON d.domain = q.domain
+                WHERE ((q.status = 'pending' AND q.available_at <= :now)
+                       OR (q.status = 'leased' AND q.lease_expires <= :now AND q.attempts < :max_attempts))
+                  AND d.next_allowed <= :now
+                ORDER BY q.attempts, q.id
+                LIMIT 1
+                """, {'now': now, 'max_attempts': max_attempts}).fetchone()
+            if row is None:
+                wait = self._next_ready(now)
+                self.conn.execute('COMMIT')
+                return None, wait
+            task_id, url, domain, attempts = row
+            token = uuid.uuid4().hex
+            self.conn.execute(
+                "UPDATE crawl_queue SET status = 'leased', attempts = attempts + 1, lease_token = ?, "
+                "lease_owner = ?, lease_expires = ?, updated_at = ? WHERE id = ?",
+                (token, self.owner, now + lease_seconds, now, task_id))
+            self.conn.execute('UPDATE crawl_domains SET next_allowed = ? WHERE domain = ?',
+                              (now + domain_delay(domain), domain))
+            self.conn.execute('COMMIT')
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        return {'id': task_id, 'url': url, 'domain': domain, 'attempt': attempts + 1, 'token': token}, 0
+
+    def _next_ready(self, now):
+        """最早何时有链接可领取；没有未完成的链接时返回 None"""
+        row = self.conn.execute(
+            """
+            SELECT MIN(MAX(d.next_allowed,
+                           CASE q.status WHEN 'pending' THEN q.available_at ELSE q.lease_expires END))
+            FROM crawl_queue q JOIN crawl_domains d ON d.domain = q.domain
+            WHERE q.status IN ('pending', 'leased')
+            """).fetchone()
+        return None if row[0] is None else max(row[0] - now, 0.0)
+
+    def extend(self, task, lease_seconds=LEASE_SECONDS):
+        """续租 (抓取耗时较长时)"""
+        with self.conn:
+            cur = self.conn.execute(
+                "UPDATE crawl_queue SET lease_expires = ? WHERE id = ? AND status = 'leased' AND lease_token = ?",
+                (time.time() + lease_seconds, task['id'], task['token']))
+        if cur.rowcount == 0:
+            raise LeaseLost(task['url'])
+
+    # --- 提交结果 ---
+
+    def _release(self, task, status, **fields):
+        """持有租约时更新状态；租约已失效时抛出 LeaseLost (调用方在事务内)"""
+        sets = ', '.join(f'{k} = :{k}' for k in fields)
+        cur = self.conn.execute(
+            f"UPDATE crawl_queue SET status = :status, lease_token = NULL, lease_expires = NULL, "
+            f"updated_at = :now{', ' + sets if sets else ''} "
+            f"WHERE id = :id AND status = 'leased' AND lease_token = :token",
+            {'status': status, 'now': time.time(), 'id': task['id'], 'token': task['token'], **fields})
+        if cur.rowcount == 0:
+            raise LeaseLost(task['url'])
+
+    def complete(self, task, row=None, corpus=None):
+        """标记完成并写入抓取结果 (同一事务)；返回文档 id (内容重复时为已有文档的 id)"""
+        with self.conn:
+            doc_id = None
+            if row is not None:
+                rec = self.store.prepare_rows([row], corpus)[0]
+                cur = self.conn.execute(INSERT_SQL, rec)
+                if cur.rowcount:
+                    doc_id = cur.lastrowid
+                else:
+                    doc_id = self.conn.execute('SELECT id FROM documents WHERE corpus = ? AND content_hash = ?',
+                                               (rec['corpus'], rec['content_hash'])).fetchone()[0]
+            self._release(task, 'done', doc_id=doc_id, error=None)
+        return doc_id
+
+    def fail(self, task, error, max_attempts=MAX_ATTEMPTS, backoff=RETRY_BACKOFF):
+        """抓取失败：未超过重试次数则延后重新入队，否则标记为 failed"""
+        if task['attempt'] >= max_attempts:
+            status, available = 'failed', 0
+        else:
+            status, available = 'pending', time.time() + backoff * task['attempt']
+        with self.conn:
+            self._release(task, status, error=str(error)[:500], available_at=available)
+        return status
+
+    # --- 统计 ---
+
+    def counts(self):
+        return pd.read_sql_query(
+            'SELECT domain, status, COUNT(*) AS urls FROM crawl_queue GROUP BY domain, status ORDER BY domain, status',
+            self.conn)
+
+    def remaining(self):
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM crawl_queue WHERE status IN ('pending', 'leased')").fetchone()[0]
+
+def main():
+    ap = argparse.ArgumentParser(description='基于租约的抓取队列')
+    ap.add_argument('--store', default=STORE_FILE, help='语料库文件路径 (队列表存放于同一文件)')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p = sub.add_parser('enqueue', help='从文本文件 (每行一个链接) 入队')
+    p.add_argument('file')
+    sub.add_parser('stats', help='各域名/状态的链接数')
+    sub.add_parser('retry', help='失败的链接重新入队')
+    args = ap.parse_args()
+
+    with CrawlQueue(args.store) as queue:
+        if args.cmd == 'enqueue':
+            with open(args.file, 'r', encoding='utf-8') as f:
+                print(f"新增 {queue.enqueue(f)} 个链接")
+        elif args.cmd == 'retry':
+            print(f"重新入队 {queue.retry_failed()} 个链接")
+        print(queue.counts().to_string(index=False))
+
+if __name__ == "__main__":
+    main()
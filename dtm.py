@@ -0,0 +1,191 @@
+"""
+持久化的文档-词项矩阵 (DTM)
+
+语料只切词一次：词表 + CSR 稀疏矩阵保存为 .npy 文件，读取时用内存映射，
+共现网络、TF-IDF、主题模型和关键词提取都复用同一份矩阵。
+缓存以 "语料指纹 + 切词配置" 命名，语料或切词规则变化时才重建。
+
+    dtm = load_or_build('think_tank', lambda: DocumentTermMatrix.from_texts(df['Content'], tokenize),
+                        texts_key(df['Content']), config=TOKENIZER_CONFIG)
+    matrix, words = dtm.cooccurrence(top_n=30)
+"""
+import hashlib
+import inspect
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfTransformer
+
+from token_corpus import TokenCorpus
+
+# --- 配置 ---
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+DTM_DIR = os.path.join(ROOT_DIR, 'data', 'dtm')
+FORMAT_VERSION = 1
+ARRAYS = ('data', 'indices', 'indptr')
+
+# ============================
+# 1. 指纹
+# ============================
+
+def texts_key(texts):
+    """内存中语料的指纹 (按文本内容哈希)"""
+    series = pd.Series(texts).fillna('').astype(str)
+    return hashlib.sha256(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes()).hexdigest()
+
+def file_key(path):
+    """语料文件的指纹 (按文件内容哈希)"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def source_key(*funcs):
+    """函数源码的指纹 (切词函数一改，缓存自动失效，无需手工改版本号)"""
+    h = hashlib.sha256()
+    for func in funcs:
+        h.update(inspect.getsource(func).encode('utf-8'))
+    return h.hexdigest()
+
+def fingerprint(corpus_key, config):
+    payload = json.dumps({'corpus': corpus_key, 'tokenizer': config, 'format': FORMAT_VERSION}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+# ============================
+# 2. 文档-词项矩阵
+# ============================
+
+class DocumentTermMatrix:
+    """词表 (按字母排序) + CSR 词频矩阵 (行=文档，列=词)"""
+
+    def __init__(self, vocab, X, meta=None):
+        self.vocab = np.asarray(vocab, dtype=object)
+        self.X = X
+        self.meta = meta or {}
+        self._index = None
+
+    @property
+    def shape(self):
+        return self.X.shape
+
+    def term_index(self):
+        if self._index is None:
+            self._index = {w: i for i, w in enumerate(self.vocab)}
+        return self._index
+
+    # --- 构建 ---
+
+    @classmethod
+    def from_token_corpus(cls, corpus):
+        """由整数词元语料构建 (一次向量化计数)；只保留出现过的词，按字母排序"""
+        X = corpus.to_csr()
+        vocab = np.asarray(corpus.vocab, dtype=object)
+        used = np.flatnonzero(np.asarray(X.sum(axis=0)).ravel() > 0)
+        order = used[np.argsort(vocab[used], kind='stable')]
+        X = X[:, order].tocsr()
+        X.sort_indices()
+        return cls(vocab[order], X)
+
+    @classmethod
+    def from_token_lists(cls, token_lists):
+        return cls.from_token_corpus(TokenCorpus.from_token_lists(token_lists))
+
+    @classmethod
+    def from_texts(cls, texts, tokenizer):
+        return cls.from_token_corpus(TokenCorpus.from_texts(texts, tokenizer))
+
+    # --- 持久化 ---
+
+    def save(self, path):
+        """保存为 .npy (可内存映射) + 词表/元信息 JSON；先写临时目录再替换"""
+        tmp = path + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name in ARRAYS:
+            np.save(os.path.join(tmp, f'{name}.npy'), getattr(self.X, name))
+        with open(os.path.join(tmp, 'vocab.json'), 'w', encoding='utf-8') as f:
+            json.dump(list(self.vocab), f, ensure_ascii=False)
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({**self.meta, 'shape': list(self.shape)}, f, indent=2, ensure_ascii=False)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """读取；mmap=True 时数组以只读内存映射打开，不占用进程内存"""
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r' if mmap else None)
+                  for name in ARRAYS}
+        with open(os.path.join(path, 'vocab.json'), 'r', encoding='utf-8') as f:
+            vocab = json.load(f)
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        X = sp.csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']),
+                          shape=tuple(meta['shape']), copy=False)
+        return cls(vocab, X, meta)
+
+    # ============================
+    # 3. 下游阶段
+    # ============================
+
+    def term_counts(self):
+        return np.asarray(self.X.sum(axis=0)).ravel()
+
+    def top_terms(self, top_n, exclude=ENGLISH_STOP_WORDS):
+        """按总词频取前 top_n 个词的列号 (按字母序返回)"""
+        counts = self.term_counts().astype(float)
+        if exclude:
+            counts[[i for i, w in enumerate(self.vocab) if w in exclude]] = -1
+        candidates = np.flatnonzero(counts > 0)
+        top = candidates[np.argsort(-counts[candidates], kind='stable')[:top_n]]
+        return np.sort(top)
+
+    def cooccurrence(self, top_n=30, exclude=ENGLISH_STOP_WORDS):
+        """高频词共现矩阵 (文档内词频乘积之和)，与 CountVectorizer(max_features, stop_words='english') 一致"""
+        cols = self.top_terms(top_n, exclude)
+        sub = self.X[:, cols]
+        return (sub.T @ sub).tocsr(), self.vocab[cols]
+
+    def tfidf(self, **kwargs):
+        return TfidfTransformer(**kwargs).fit_transform(self.X)
+
+    def keywords(self, top_k=20, exclude=ENGLISH_STOP_WORDS):
+        """按 TF-IDF 总分排序的关键词"""
+        scores = np.asarray(self.tfidf().sum(axis=0)).ravel()
+        if exclude:
+            scores[[i for i, w in enumerate(self.vocab) if w in exclude]] = 0
+        top = np.argsort(-scores, kind='stable')[:top_k]
+        return pd.Series(scores[top], index=self.vocab[top])
+
+    def topics(self, n_topics=5, top_words=10, seed=42):
+        """LDA 主题：返回每个主题的代表词"""
+        from sklearn.decomposition import LatentDirichletAllocation
+        lda = LatentDirichletAllocation(n_components=n_topics, random_state=seed)
+        lda.fit(self.X)
+        return [list(self.vocab[np.argsort(-comp)[:top_words]]) for comp in lda.components_]
+
+# ============================
+# 4. 缓存
+# ============================
+
+def load_or_build(name, build, corpus_key, config, cache_dir=DTM_DIR):
+    """指纹一致时直接内存映射读取，否则调用 build() 构建并保存
+    build 返回 DocumentTermMatrix (只有需要重建时才会调用)"""
+    fp = fingerprint(corpus_key, config)
+    path = os.path.join(cache_dir, f'{name}-{fp}')
+    if os.path.exists(os.path.join(path, 'meta.json')):
+        return DocumentTermMatrix.load(path)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # 同名的旧版本缓存已失效，清理掉
+    for old in os.listdir(cache_dir):
+        if old.startswith(f'{name}-') and old != os.path.basename(path):
+            shutil.rmtree(os.path.join(cache_dir, old), ignore_errors=True)
+    dtm = build()
+    dtm.meta = {'name': name, 'fingerprint': fp, 'tokenizer': config}
+    dtm.save(path)
+    return DocumentTermMatrix.load(path)
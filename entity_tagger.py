@@ -0,0 +1,295 @@
+"""
+实体与政策术语标注 (Aho–Corasick 自动机)
+
+词典中的公司、技术、政策名称 (含别名) 编译成一个 Aho–Corasick 自动机，
+每篇 Content 只扫描一遍，逐词状态转移，耗时与词典大小无关。
+自动机以 "词" 为转移单位 (而不是字符)：天然满足词边界 ("ear" 不会命中 "year")，
+多词名称 ("Lam Research"、"Section 232") 和连字符写法 ("high-bandwidth") 也一并处理。
+匹配默认不区分大小写；容易与普通词混淆的写法 (如 EAR、Intel) 要求大小写一致。
+重叠的命中取最左最长 ("Entity List" 不会再拆出 "List")。
+ENTITIES 是全项目唯一的术语词典：倒排索引的实体词条 (图 3_4)、分组统计的议题覆盖率 (图 3_5)
+和聚合立方体的关键词维度都由它生成。
+
+    tagger = EntityTagger()
+    tagger.tag("Nvidia and Lam Research were added to the Entity List")
+    hits = tag_corpus(df['Content'], jobs=4)          # 每条命中: doc / entity / type / start / end / surface
+    mentions_any(df['Content'])                       # 每篇是否提及词典中的任一实体
+    entity_sentiment(hits, df['sentiment'])           # 各实体提及文档的情感
+    co_mentions(hits)                                 # 同一文档中共同出现的实体对
+
+    python entity_tagger.py [--jobs 4] [--out entity_hits.csv]
+"""
+import argparse
+import hashlib
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# --- 配置 ---
+CHUNK_SIZE = 500
+WORD_RE = re.compile(r'\w+')
+
+# 规范名 -> (类别, 别名)；规范名本身也参与匹配
+ENTITIES = {
+    # 公司
+    'Nvidia': ('company', ['NVIDIA Corp']),
+    'Intel': ('company', ['Intel Corp']),
+    'AMD': ('company', ['Advanced Micro Devices']),
+    'Applied Materials': ('company', ['AMAT']),
+    'Lam Research': ('company', []),
+    'KLA': ('company', ['KLA Corp', 'KLA-Tencor']),
+    'Micron': ('company', ['Micron Technology']),
+    'Qualcomm': ('company', []),
+    'ASML': ('company', []),
+    'Tokyo Electron': ('company', []),
+    'TSMC': ('company', ['Taiwan Semiconductor', 'Taiwan Semiconductor Manufacturing Company']),
+    'Samsung': ('company', ['Samsung Electronics']),
+    'SK Hynix': ('company', ['Hynix']),
+    'Huawei': ('company', ['HiSilicon']),
+    'SMIC': ('company', ['Semiconductor Manufacturing International Corporation']),
+    'YMTC': ('company', ['Yangtze Memory', 'Yangtze Memory Technologies']),
+    'CXMT': ('company', ['ChangXin Memory']),
+    'DeepSeek': ('company', []),
+    # 技术
+    'Semiconductors': ('technology', ['semiconductor', 'chip', 'chips']),
+    'CPU': ('technology', ['CPUs', 'processors', 'logic chips']),
+    'Memory Chips': ('technology', ['memory chip']),
+    'AI': ('technology', ['artificial intelligence', 'LLM', 'LLMs', 'large language models']),
+    'GPU': ('technology', ['GPUs', 'graphics processing unit', 'graphics processing units']),
+    'HBM': ('technology', ['high bandwidth memory', 'high-bandwidth memory']),
+    'DRAM': ('technology', []),
+    'NAND': ('technology', []),
+    'Advanced Packaging': ('technology', ['chiplet', 'chiplets', 'packaging', 'stacking']),
+    'EUV': ('technology', ['extreme ultraviolet', 'EUV lithography']),
+    'AI Chips': ('technology', ['AI chip', 'AI accelerators', 'AI accelerator']),
+    'H20': ('technology', ['H20s']),
+    # 政策
+    'Entity List': ('policy', []),
+    'EAR': ('policy', ['Export Administration Regulations']),
+    'Export Controls': ('policy', ['export control']),
+    'Section 232': ('policy', []),
+    'Tariffs': ('policy', ['tariff']),
+    'Trade War': ('policy', ['trade wars']),
+    'Sanctions': ('policy', ['sanction']),
+    'CHIPS Act': ('policy', ['CHIPS and Science Act']),
+    'Foreign Direct Product Rule': ('policy', ['FDPR', 'foreign direct product rule']),
+    'AI Diffusion Rule': ('policy', ['AI diffusion rule', 'AI diffusion framework']),
+    'BIS': ('policy', ['Bureau of Industry and Security']),
+}
+# 必须大小写一致才算命中的写法 (与普通英文词同形)
+CASE_SENSITIVE = {'EAR', 'AMAT', 'BIS', 'Intel'}   # intel = intelligence
+
+def dictionary_key(entities=ENTITIES, case_sensitive=CASE_SENSITIVE):
+    """词典指纹：词典改动后，依赖标注结果的缓存 (如倒排索引) 据此重新标注"""
+    text = repr((sorted((k, v[0], list(v[1])) for k, v in entities.items()), sorted(case_sensitive)))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+Hit = namedtuple('Hit', ['entity', 'type', 'start', 'end', 'surface'])
+HIT_COLUMNS = ['doc', 'entity', 'type', 'start', 'end', 'surface']
+
+def _fold(text):
+    """小写化且保持长度不变 (字符偏移与原文一一对应)"""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return ''.join(ch if len(ch.lower()) != 1 else ch.lower() for ch in text)
+
+# ============================
+# 1. 自动机
+# ============================
+
+class EntityTagger:
+    """以词为转移单位的 Aho–Corasick 自动机"""
+
+    def __init__(self, entities=ENTITIES, case_sensitive=CASE_SENSITIVE):
+        self.names = []
+        self.types = []
+        self.goto = [{}]      # 状态 -> {词: 下一状态}
+        self.fail = [0]
+        self.out = [[]]       # 状态 -> [(实体编号, 词数, 需大小写一致的原文词元或 None)]
+        for name, (kind, aliases) in entities.items():
+            self.add(name, kind, aliases, case_sensitive)
+        self._build()
+
+    def add(self, name, kind, aliases=(), case_sensitive=()):
+        entity = len(self.names)
+        self.names.append(name)
+        self.types.append(kind)
+        for alias in dict.fromkeys([name, *aliases]):
+            words = WORD_RE.findall(alias)
+            if not words:
+                continue
+            state = 0
+            for word in words:
+                word = word.lower()
+                nxt = self.goto[state].get(word)
+                if nxt is None:
+                    nxt = self.goto[state][word] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append((entity, len(words), tuple(words) if alias in case_sensitive else None))
+
+    def _build(self):
+        """广度优先计算失败指针，并把后缀状态的输出并入当前状态"""
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for word, nxt in self.goto[state].items():
+                f = self.fail[state]
+                while f and word not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(word, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+                queue.append(nxt)
+
+    # ============================
+    # 2. 标注
+    # ============================
+
+    def tag(self, text):
+        """返回一篇文本的命中列表 (按位置排序，不重叠)"""
+        if not text:
+            return []
+        matches = list(WORD_RE.finditer(_fold(text)))
+        goto, fail, out = self.goto, self.fail, self.out
+        found = []     # (起始词序号, 结束词序号, 实体)
+        state = 0
+        for i, m in enumerate(matches):
+            word = m.group()
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for entity, n_words, exact in out[state]:
+                first = i - n_words + 1
+                if exact is not None and tuple(text[w.start():w.end()] for w in matches[first:i + 1]) != exact:
+                    continue
+                found.append((first, i, entity))
+
+        # 最左最长，去掉重叠
+        hits = []
+        last = -1
+        for first, end, entity in sorted(found, key=lambda h: (h[0], h[0] - h[1])):
+            if first <= last:
+                continue
+            start, stop = matches[first].start(), matches[end].end()
+            hits.append(Hit(self.names[entity], self.types[entity], start, stop, text[start:stop]))
+            last = end
+        return hits
+
+    def iter_hits(self, texts, first_doc=0):
+        """流式标注：逐条产出 (文档编号, 实体, 类别, 起点, 终点, 原文)"""
+        for doc, text in enumerate(texts, start=first_doc):
+            if not isinstance(text, str):
+                continue
+            for hit in self.tag(text):
+                yield (doc, *hit)
+
+    def tag_frame(self, texts, first_doc=0):
+        return pd.DataFrame(list(self.iter_hits(texts, first_doc)), columns=HIT_COLUMNS)
+
+_default_tagger = None
+
+def default_tagger():
+    """默认词典的自动机 (每个进程构建一次)"""
+    global _default_tagger
+    if _default_tagger is None:
+        _default_tagger = EntityTagger()
+    return _default_tagger
+
+def _tag_chunk(chunk, tagger=None):
+    tagger = tagger or default_tagger()
+    first_doc, texts = chunk
+    return tagger.tag_frame(texts, first_doc)
+
+def tag_corpus(texts, tagger=None, jobs=1, chunksize=CHUNK_SIZE):
+    """按文档块标注整份语料；jobs > 1 时各块在独立进程中并行扫描
+    doc 为文档在 texts 中的序号 (与 df 行位置对齐)"""
+    texts = list(texts)
+    chunks = [(i, texts[i:i + chunksize]) for i in range(0, len(texts), chunksize)]
+    work = partial(_tag_chunk, tagger=tagger)
+    if jobs > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parts = list(pool.map(work, chunks))
+    else:
+        parts = [work(c) for c in chunks]
+    parts = [p for p in parts if len(p)]
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=HIT_COLUMNS)
+
+def mentions_any(texts, entities=None, tagger=None):
+    """每篇文本是否提及 entities 中的任一实体 (默认词典中的任一实体)，返回布尔数组"""
+    tagger = tagger or default_tagger()
+    wanted = None if entities is None else set(entities)
+    return np.array([isinstance(t, str) and any(wanted is None or h.entity in wanted for h in tagger.tag(t))
+                     for t in texts], dtype=bool)
+
+# ============================
+# 3. 下游统计
+# ============================
+
+def entity_sentiment(hits, sentiment):
+    """各实体：提及次数、提及文档数、这些文档的平均情感与标准差
+    sentiment 与标注时的 texts 按位置对齐"""
+    values = np.asarray(sentiment, dtype=float)
+    per_doc = hits.groupby(['entity', 'type', 'doc'], sort=False).size().rename('mentions').reset_index()
+    per_doc['sentiment'] = values[per_doc['doc'].to_numpy(dtype=np.int64)]
+    out = per_doc.groupby(['entity', 'type']).agg(
+        mentions=('mentions', 'sum'), docs=('doc', 'size'),
+        mean_sentiment=('sentiment', 'mean'), std_sentiment=('sentiment', 'std'))
+    return out.sort_values(['docs', 'mentions'], ascending=False)
+
+def co_mentions(hits, min_docs=1):
+    """同一文档中共同出现的实体对及文档数 (文档 x 实体 的 0/1 矩阵自乘)"""
+    if hits.empty:
+        return pd.DataFrame(columns=['entity_a', 'entity_b', 'docs'])
+    doc_codes, docs = pd.factorize(hits['doc'])
+    ent_codes, entities = pd.factorize(hits['entity'])
+    X = sp.csr_matrix((np.ones(len(hits), dtype=np.int32), (doc_codes, ent_codes)),
+                      shape=(len(docs), len(entities)))
+    X.sum_duplicates()
+    X.data[:] = 1   # 只看是否提及，不计次数
+    C = sp.triu(X.T @ X, k=1).tocoo()
+    pairs = pd.DataFrame({'entity_a': entities[C.row], 'entity_b': entities[C.col], 'docs': C.data})
+    # 每对按字母序排列，便于查找
+    swap = pairs['entity_a'] > pairs['entity_b']
+    pairs.loc[swap, ['entity_a', 'entity_b']] = pairs.loc[swap, ['entity_b', 'entity_a']].to_numpy()
+    pairs = pairs[pairs['docs'] >= min_docs]
+    return pairs.sort_values(['docs', 'entity_a', 'entity_b'], ascending=[False, True, True], ignore_index=True)
+
+def main():
+    import analysis
+    ap = argparse.ArgumentParser(description='实体与政策术语标注')
+    ap.add_argument('--jobs', type=int, default=1, help='并行进程数')
+    ap.add_argument('--out', default=None, help='把全部命中写入CSV')
+    args = ap.parse_args()
+
+    corpora = {
+        'media': analysis.MEDIA_FILE,
+        'think_tank': analysis.THINK_TANK_FILE,
+        'expert': analysis.EXPERT_FILE,
+    }
+    all_hits = []
+    for corpus, path in corpora.items():
+        if not os.path.exists(path):
+            print(f"[Warn] 找不到 {path}")
+            continue
+        df = analysis.read_corpus(path, ['Source', 'Content'])
+        hits = tag_corpus(df['Content'], jobs=args.jobs)
+        sentiment = df['Content'].apply(analysis.get_sentiment)
+        print(f"\n[{corpus}] {len(df)} 篇, {len(hits)} 处命中")
+        print(entity_sentiment(hits, sentiment).head(10).to_string())
+        print(co_mentions(hits).head(5).to_string(index=False))
+        all_hits.append(hits.assign(corpus=corpus))
+
+    if args.out and all_hits:
+        pd.concat(all_hits, ignore_index=True).to_csv(args.out, index=False, encoding='utf-8-sig')
+        print(f"\n命中已写入 {args.out}")
+
+if __name__ == "__main__":
+    main()
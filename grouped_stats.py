@@ -0,0 +1,158 @@
+"""
+分组统计引擎：按 (来源, 时间桶) 一次向量化计算均值、方差/波动率、篇数和关键词覆盖率
+
+统计量以 (n, mean, M2) 形式保存 (Welford/Chan 并行算法)，
+分块或多进程得到的结果可以精确合并，与整表一次计算的结果一致。
+
+    stats = GroupedStats(keywords={'topic': r'export control|entity list'})   # 正则，或 文本序列 -> 布尔数组 的函数
+    for chunk in chunks:
+        stats.update(chunk, source_col='Source', date_col='dt_date')
+    stats.result()            # 每个 (来源, 月份) 一行
+    stats.rollup('source')    # 汇总到来源
+"""
+import numpy as np
+import pandas as pd
+
+from entity_tagger import mentions_any
+
+# 默认议题 (用于计算 Topic_Coverage)：提及 entity_tagger 词典中任一公司/技术/政策的文档
+TOPIC_KEYWORDS = {
+    'topic': mentions_any,
+}
+
+INDEX_NAMES = ['source', 'bucket']
+# 不区分来源时使用的分组名
+ALL_SOURCES = '*'
+
+# ============================
+# 1. 分组汇总 (单次向量化)
+# ============================
+
+def time_bucket(dt, freq='M'):
+    """把时间对齐到所在周期的末尾 (月度与 resample('ME') 的标签一致)"""
+    if freq == 'M':
+        return dt.dt.to_period('M').dt.to_timestamp() + pd.offsets.MonthEnd(0)
+    return dt.dt.to_period(freq).dt.end_time.dt.normalize()
+
+def summarize(df, source_col='Source', date_col='dt_date', value_col='sentiment',
+              text_col='Content', keywords=None, freq='M'):
+    """对一个数据块做一次分组聚合，返回 n/mean/m2/关键词命中数 (source_col=None 时不分来源)"""
+    keywords = TOPIC_KEYWORDS if keywords is None else keywords
+    if date_col and date_col in df.columns:
+        bucket = time_bucket(df[date_col], freq)
+    else:
+        bucket = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+
+    frame = pd.DataFrame({
+        'source': df[source_col].astype(str).to_numpy() if source_col else ALL_SOURCES,
+        'bucket': bucket.to_numpy(),
+        'value': df[value_col].to_numpy(dtype=float),
+    })
+    text = df[text_col].fillna('').astype(str)
+    for name, pattern in keywords.items():
+        if callable(pattern):
+            frame[f'kw_{name}'] = np.asarray(pattern(text), dtype=bool)
+        else:
+            frame[f'kw_{name}'] = text.str.contains(pattern, case=False, regex=True).to_numpy()
+
+    grouped = frame.groupby(INDEX_NAMES, dropna=False, sort=True)
+    frame['sq_dev'] = (frame['value'] - grouped['value'].transform('mean')) ** 2
+
+    agg = {'n': ('value', 'size'), 'mean': ('value', 'mean'), 'm2': ('sq_dev', 'sum')}
+    agg.update({c: (c, 'sum') for c in frame.columns if c.startswith('kw_')})
+    out = frame.groupby(INDEX_NAMES, dropna=False, sort=True).agg(**agg)
+    out['n'] = out['n'].astype(float)
+    return out
+
+# ============================
+# 2. 合并 (Chan 并行公式)
+# ============================
+
+def merge(a, b):
+    """精确合并两张汇总表 (索引为 source/bucket)"""
+    if a is None: return b
+    if b is None: return a
+    index = a.index.union(b.index)
+    a = a.reindex(index, fill_value=0.0)
+    b = b.reindex(index, fill_value=0.0)
+
+    n = a['n'] + b['n']
+    delta = b['mean'] - a['mean']
+    safe_n = n.where(n > 0, 1.0)
+    out = a.copy()
+    out['n'] = n
+    out['mean'] = a['mean'] + delta * b['n'] / safe_n
+    out['m2'] = a['m2'] + b['m2'] + delta ** 2 * a['n'] * b['n'] / safe_n
+    for c in a.columns:
+        if c.startswith('kw_'):
+            out[c] = a[c] + b[c]
+    return out
+
+def collapse(table, level):
+    """把汇总表沿索引层级合并 (如按来源汇总所有时间桶)"""
+    grouped = table.groupby(level=level, dropna=False)
+    n = grouped['n'].sum()
+    mean = (table['n'] * table['mean']).groupby(level=level, dropna=False).sum() / n.where(n > 0, 1.0)
+    dev = table['mean'] - mean.reindex(table.index.get_level_values(level)).to_numpy()
+    m2 = (table['m2'] + table['n'] * dev ** 2).groupby(level=level, dropna=False).sum()
+    out = pd.DataFrame({'n': n, 'mean': mean, 'm2': m2})
+    for c in table.columns:
+        if c.startswith('kw_'):
+            out[c] = grouped[c].sum()
+    return out
+
+def finalize(table):
+    """由 n/mean/m2 得到可读的统计结果"""
+    n = table['n']
+    out = pd.DataFrame(index=table.index)
+    out['count'] = n.astype(int)
+    out['mean'] = table['mean']
+    out['variance'] = table['m2'] / n.where(n > 0, np.nan)
+    out['volatility'] = np.sqrt(out['variance'])
+    for c in table.columns:
+        if c.startswith('kw_'):
+            out[f'coverage_{c[3:]}'] = table[c] / n.where(n > 0, np.nan) * 100
+    return out
+
+# ============================
+# 3. 流式累加器
+# ============================
+
+class GroupedStats:
+    """可增量更新、可合并的分组统计累加器"""
+
+    def __init__(self, keywords=None, freq='M'):
+        self.keywords = TOPIC_KEYWORDS if keywords is None else dict(keywords)
+        self.freq = freq
+        self.table = None
+
+    def update(self, df, source_col='Source', date_col='dt_date', value_col='sentiment', text_col='Content'):
+        if len(df):
+            part = summarize(df, source_col, date_col, value_col, text_col, self.keywords, self.freq)
+            self.table = merge(self.table, part)
+        return self
+
+    def merge(self, other):
+        """合并另一个累加器 (如其他进程的结果)"""
+        self.table = merge(self.table, other.table)
+        return self
+
+    def result(self):
+        if self.table is None:
+            return finalize(pd.DataFrame(columns=['n', 'mean', 'm2'],
+                                         index=pd.MultiIndex.from_tuples([], names=INDEX_NAMES)))
+        return finalize(self.table)
+
+    def rollup(self, level='source'):
+        """汇总到某一层级 (默认按来源，跨所有时间桶)"""
+        if self.table is None:
+            return self.result()
+        return finalize(collapse(self.table, level))
+
+    def series(self, source, stat='mean'):
+        """取某个来源的时间序列"""
+        res = self.result()
+        if source not in res.index.get_level_values('source'):
+            return pd.Series(dtype=float)
+        s = res.xs(source, level='source')[stat]
+        return s[s.index.notna()].sort_index()
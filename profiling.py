@@ -0,0 +1,291 @@
+"""
+可选的性能剖析钩子 (默认关闭)
+
+    from profiling import stage
+
+    @stage('fetch')
+    def fetch(url): ...
+
+    with stage('sentiment'):
+        ...
+
+开启方式 (环境变量或命令行参数, 二者等价):
+    DJ_PROFILE=cprofile   / --profile cprofile   cProfile 统计, 写出 <目录>/profile.prof
+    DJ_PROFILE=sample     / --profile sample     采样剖析, 写出火焰图用的折叠栈 <目录>/stacks.collapsed
+    DJ_TRACEMALLOC=1      / --trace-malloc       统计每个阶段的 tracemalloc 峰值内存
+    DJ_PROFILE_DIR=目录   / --profile-dir 目录    输出目录 (默认 profile_out)
+
+任一开关打开后, 各阶段的调用次数/耗时/峰值内存会在退出时打印并写入 <目录>/stages.json。
+全部关闭时, 被装饰的函数只多一次布尔判断。
+"""
+import atexit
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+PROFILE_MODES = ('cprofile', 'sample')
+DEFAULT_DIR = 'profile_out'
+SAMPLE_INTERVAL = 0.005
+
+class _Settings:
+    enabled = False
+    mode = None
+    trace_malloc = False
+    out_dir = DEFAULT_DIR
+
+_settings = _Settings()
+_local = threading.local()
+_lock = threading.Lock()
+# 阶段名 -> {'calls', 'seconds', 'peak_bytes'}
+_records = {}
+_profiler = None
+_sampler = None
+_active = 0
+_report_registered = False
+# 线程ID -> 当前阶段名列表 (供采样线程读取)
+_thread_stages = {}
+
+# ============================
+# 1. 配置
+# ============================
+
+def configure(mode=None, trace_malloc=False, out_dir=None):
+    """打开/关闭剖析；mode 为 None/'cprofile'/'sample'"""
+    global _report_registered
+    if mode not in (None,) + PROFILE_MODES:
+        raise ValueError(f"未知的剖析模式: {mode} (可选 {', '.join(PROFILE_MODES)})")
+    _settings.mode = mode
+    _settings.trace_malloc = bool(trace_malloc)
+    _settings.out_dir = out_dir or _settings.out_dir
+    _settings.enabled = bool(mode or trace_malloc)
+    if _settings.enabled and not _report_registered:
+        atexit.register(report)
+        _report_registered = True
+
+def configure_from_env(environ=os.environ):
+    mode = environ.get('DJ_PROFILE', '').strip().lower() or None
+    trace = environ.get('DJ_TRACEMALLOC', '').strip().lower() in ('1', 'true', 'yes')
+    if mode or trace:
+        configure(mode, trace, environ.get('DJ_PROFILE_DIR') or None)
+
+def add_arguments(parser):
+    """给脚本的 argparse 加上剖析开关"""
+    group = parser.add_argument_group('性能剖析')
+    group.add_argument('--profile', choices=PROFILE_MODES, default=None, help='开启 cProfile 或采样剖析')
+    group.add_argument('--trace-malloc', action='store_true', help='统计各阶段峰值内存')
+    group.add_argument('--profile-dir', default=None, help=f'剖析结果目录 (默认 {DEFAULT_DIR})')
+
+def configure_from_args(args):
+    """命令行开关优先；未指定时保留环境变量的配置"""
+    if args.profile or args.trace_malloc:
+        configure(args.profile, args.trace_malloc, args.profile_dir)
+    elif args.profile_dir:
+        # 由环境变量开启时目录同样以命令行为准
+        _settings.out_dir = args.profile_dir
+
+def enabled():
+    return _settings.enabled
+
+def settings():
+    """当前开关 (可传给子进程的 configure)；未开启时为 None"""
+    if not _settings.enabled:
+        return None
+    return {'mode': _settings.mode, 'trace_malloc': _settings.trace_malloc, 'out_dir': _settings.out_dir}
+
+# ============================
+# 2. 阶段计时 (装饰器 / 上下文管理器)
+# ============================
+
+class _Frame:
+    __slots__ = ('name', 'start', 'base', 'peak')
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+class stage:
+    """标记一个阶段；既可作装饰器也可作 with 语句"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __call__(self, func):
+        name = self.name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _settings.enabled:
+                return func(*args, **kwargs)
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def __enter__(self):
+        if _settings.enabled:
+            _enter(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        if _settings.enabled and _stack():
+            _exit()
+        return False
+
+def _enter(name):
+    global _active
+    stack = _stack()
+    frame = _Frame()
+    frame.name = name
+    frame.peak = 0
+    frame.base = 0
+    if _settings.trace_malloc:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        current, peak = tracemalloc.get_traced_memory()
+        # reset_peak 前把当前峰值记到所有外层阶段上
+        for outer in stack:
+            outer.peak = max(outer.peak, peak)
+        tracemalloc.reset_peak()
+        frame.base = current
+    stack.append(frame)
+    if _settings.mode == 'sample':
+        _thread_stages[threading.get_ident()] = [f.name for f in stack]
+
+    with _lock:
+        _active += 1
+        if _active == 1:
+            _start_profilers()
+    frame.start = time.perf_counter()
+
+def _exit():
+    global _active
+    stack = _stack()
+    frame = stack.pop()
+    elapsed = time.perf_counter() - frame.start
+    if _settings.mode == 'sample':
+        if stack:
+            _thread_stages[threading.get_ident()] = [f.name for f in stack]
+        else:
+            _thread_stages.pop(threading.get_ident(), None)
+
+    with _lock:
+        _active -= 1
+        if _active == 0:
+            _stop_profilers()
+
+    peak_bytes = None
+    if _settings.trace_malloc and tracemalloc.is_tracing():
+        frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+        peak_bytes = frame.peak - frame.base
+        if stack:
+            stack[-1].peak = max(stack[-1].peak, frame.peak)
+
+    with _lock:
+        rec = _records.setdefault(frame.name, {'calls': 0, 'seconds': 0.0, 'peak_bytes': None})
+        rec['calls'] += 1
+        rec['seconds'] += elapsed
+        if peak_bytes is not None:
+            rec['peak_bytes'] = max(rec['peak_bytes'] or 0, peak_bytes)
+
+# ============================
+# 3. cProfile / 采样剖析
+# ============================
+
+class _Sampler(threading.Thread):
+    """后台线程定时采集处于阶段中的线程调用栈，输出折叠栈格式"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        super().__init__(name='stage-sampler', daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self.running = threading.Event()
+        self.stopped = False
+
+    def run(self):
+        me = threading.get_ident()
+        while not self.stopped:
+            if not self.running.wait(0.1):
+                continue
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stage_names = _thread_stages.get(ident)
+                if not stage_names:
+                    continue
+                calls = []
+                while frame is not None:
+                    code = frame.f_code
+                    calls.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[';'.join(stage_names + calls[::-1])] += 1
+            time.sleep(self.interval)
+
+def _start_profilers():
+    global _profiler, _sampler
+    if _settings.mode == 'cprofile':
+        if _profiler is None:
+            _profiler = cProfile.Profile()
+        _profiler.enable()
+    elif _settings.mode == 'sample':
+        if _sampler is None:
+            _sampler = _Sampler()
+            _sampler.start()
+        _sampler.running.set()
+
+def _stop_profilers():
+    if _profiler is not None:
+        _profiler.disable()
+    if _sampler is not None:
+        _sampler.running.clear()
+
+# ============================
+# 4. 输出
+# ============================
+
+def summary():
+    """各阶段统计 (按总耗时降序)"""
+    with _lock:
+        items = sorted(_records.items(), key=lambda kv: kv[1]['seconds'], reverse=True)
+        return {name: dict(rec) for name, rec in items}
+
+def report(stream=sys.stderr):
+    """打印阶段统计并写出剖析文件 (进程退出时自动调用)"""
+    stats = summary()
+    if not stats:
+        return
+    out_dir = _settings.out_dir
+    os.makedirs(out_dir, exist_ok=True)
+    suffix = f"-{os.getpid()}" if _is_worker() else ''
+
+    print("\n>>> 阶段耗时统计:", file=stream)
+    for name, rec in stats.items():
+        mem = f"  峰值 {rec['peak_bytes'] / 2 ** 20:8.1f} MB" if rec['peak_bytes'] is not None else ''
+        print(f"   {name:<12} {rec['calls']:>6} 次 {rec['seconds']:10.3f}s{mem}", file=stream)
+
+    with open(os.path.join(out_dir, f'stages{suffix}.json'), 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2, ensure_ascii=False)
+    if _profiler is not None:
+        _profiler.dump_stats(os.path.join(out_dir, f'profile{suffix}.prof'))
+    if _sampler is not None:
+        with open(os.path.join(out_dir, f'stacks{suffix}.collapsed'), 'w', encoding='utf-8') as f:
+            for line, count in _sampler.stacks.most_common():
+                f.write(f"{line} {count}\n")
+    print(f"   剖析结果已写入 {out_dir}/", file=stream)
+
+def report_worker():
+    """在子进程中写出本进程的统计 (ProcessPoolExecutor 的子进程退出时不执行 atexit)"""
+    if _settings.enabled and _is_worker():
+        report()
+
+def _is_worker():
+    import multiprocessing
+    return multiprocessing.parent_process() is not None
+
+configure_from_env()
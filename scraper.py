@@ -1,15 +1,21 @@
 import os
+import argparse
 import time
 import random
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
 from curl_cffi import requests as cffi_requests  # 专门用于 Politico
+import profiling
+from profiling import stage
+from corpus_store import CorpusStore, STORE_FILE
+from crawl_queue import CrawlQueue, LeaseLost
 
 # --- 配置 ---
 INPUT_FILE = 'data_urls.txt'
 OUTPUT_THINK_TANK = 'us_think_tank_data.csv'
 OUTPUT_MEDIA = 'us_mainstream_media_data.csv'
+STORE_BATCH = 20  # 写入语料库时每批条数 (一个事务)
 
 # 定义分组
 THINK_TANKS = ['CNAS', 'CSET', 'CSIS']
@@ -30,14 +36,22 @@ def get_source_name(url):
     if 'voanews.com' in url: return 'VOA News'
     return 'Unknown'
 
+def get_corpus_name(source):
+    """来源 -> 语料库中的语料类别"""
+    if source in THINK_TANKS: return 'think_tank'
+    if source in MEDIA: return 'media'
+    return None
+
 # ============================
 # 1. 核心抓取函数 (网络层)
 # ============================
 
-def fetch_content_requests(url):
-    """通用抓取 (CNAS, CSET, CSIS, VOA)"""
+@stage('fetch')
+def fetch_content_requests(url, polite=True):
+    """通用抓取 (CNAS, CSET, CSIS, VOA)；队列模式下由队列按域名限速，polite=False"""
     try:
-        time.sleep(random.uniform(1, 3)) # 随机延时
+        if polite:
+            time.sleep(random.uniform(1, 3)) # 随机延时
         response = requests.get(url, headers=COMMON_HEADERS, timeout=20)
         response.raise_for_status()
         response.encoding = 'utf-8'
@@ -46,10 +60,12 @@ def fetch_content_requests(url):
         print(f"   [Error] 普通抓取失败 {url}: {e}")
         return None
 
-def fetch_content_cffi(url):
+@stage('fetch')
+def fetch_content_cffi(url, polite=True):
     """特殊抓取 (Politico) - 使用 curl_cffi 模拟真实浏览器"""
     try:
-        time.sleep(random.uniform(2, 4))
+        if polite:
+            time.sleep(random.uniform(2, 4))
         # 模拟 Chrome 120
         response = cffi_requests.get(url, impersonate="chrome120", timeout=30)
         if response.status_code != 200:
@@ -64,6 +80,7 @@ def fetch_content_cffi(url):
 # 2. 解析逻辑 (根据你提供的脚本移植)
 # ============================
 
+@stage('parse')
 def parse_cnas(html, url):
     soup = BeautifulSoup(html, 'html.parser')
     title = soup.find('h1').get_text(strip=True) if soup.find('h1') else ''
@@ -86,6 +103,7 @@ def parse_cnas(html, url):
         
     return {'Title': title, 'Date': date_text, 'URL': url, 'Content': content}
 
+@stage('parse')
 def parse_cset(html, url):
     soup = BeautifulSoup(html, 'html.parser')
     
@@ -106,6 +124,7 @@ def parse_cset(html, url):
     
     return {'Title': title, 'Date': date_text, 'URL': url, 'Content': content}
 
+@stage('parse')
 def parse_csis(html, url):
     soup = BeautifulSoup(html, 'html.parser')
     
@@ -133,6 +152,7 @@ def parse_csis(html, url):
     content = '\n\n'.join(paragraphs_list)
     return {'Title': title, 'Date': date_text, 'URL': url, 'Content': content}
 
+@stage('parse')
 def parse_politico(html, url):
     soup = BeautifulSoup(html, 'html.parser')
     
@@ -154,6 +174,7 @@ def parse_politico(html, url):
     content = '\n\n'.join(content_list)
     return {'Title': title, 'Date': date_text, 'URL': url, 'Content': content}
 
+@stage('parse')
 def parse_voa(html, url):
     soup = BeautifulSoup(html, 'html.parser')
     
@@ -173,11 +194,103 @@ def parse_voa(html, url):
         
     return {'Title': title, 'Date': date_text, 'URL': url, 'Content': content}
 
+PARSERS = {
+    'CNAS': parse_cnas,
+    'CSET': parse_cset,
+    'CSIS': parse_csis,
+    'Politico': parse_politico,
+    'VOA News': parse_voa,
+}
+
 # ============================
-# 3. 主程序
+# 3. 队列模式 (本机多进程共享 crawl_queue)
+# ============================
+
+def crawl_worker(store_path, worker_no=0, profile=None):
+    """循环领取链接 -> 抓取 -> 解析 -> 与完成标记同一事务写入语料库，直到队列为空
+    profile 为主进程的剖析设置 (spawn 方式启动的子进程不会继承)"""
+    if profile:
+        profiling.configure(**profile)
+    try:
+        return _crawl_loop(store_path, worker_no)
+    finally:
+        # 进程池的子进程退出时不执行 atexit，需在此写出本进程的阶段统计
+        profiling.report_worker()
+
+def _crawl_loop(store_path, worker_no):
+    done = 0
+    with CrawlQueue(store_path) as queue:
+        while True:
+            task, wait = queue.claim()
+            if task is None:
+                if wait is None:
+                    break
+                time.sleep(min(max(wait, 0.05), 5))
+                continue
+
+            url = task['url']
+            source = get_source_name(url)
+            print(f"[worker {worker_no}] 处理 [{source}]: {url}")
+            try:
+                if source not in PARSERS:
+                    queue.fail(task, '未知来源域名', max_attempts=1)
+                    continue
+                fetch = fetch_content_cffi if source == 'Politico' else fetch_content_requests
+                html = fetch(url, polite=False)
+                if not html:
+                    print(f"   [worker {worker_no}] 抓取失败，{queue.fail(task, 'fetch failed')}")
+                    continue
+                try:
+                    row_data = PARSERS[source](html, url)
+                except Exception as e:
+                    print(f"   [Error] 解析出错: {e}")
+                    queue.fail(task, f'parse: {e}', max_attempts=1)
+                    continue
+                row_data['来源'] = source
+                queue.complete(task, row_data, corpus=get_corpus_name(source))
+                done += 1
+            except LeaseLost:
+                # 租约已过期并被其他进程领走，本次结果丢弃
+                print(f"   [worker {worker_no}] 租约失效，放弃: {url}")
+    return done
+
+def run_queue(args):
+    with CrawlQueue(args.store) as queue:
+        if os.path.exists(INPUT_FILE):
+            with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+                print(f"入队 {queue.enqueue(f)} 个新链接，待处理 {queue.remaining()} 个")
+
+    if args.workers <= 1:
+        done = crawl_worker(args.store)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            done = sum(pool.map(crawl_worker, [args.store] * args.workers, range(args.workers),
+                                [profiling.settings()] * args.workers))
+
+    with CrawlQueue(args.store) as queue:
+        print(f"本次完成 {done} 个链接，语料库共 {len(queue.store)} 条: {args.store}")
+        print(queue.counts().to_string(index=False))
+
+# ============================
+# 4. 主程序
 # ============================
 
 def main():
+    ap = argparse.ArgumentParser(description='抓取 data_urls.txt 中的文章')
+    ap.add_argument('--store', default=None, help='同时批量写入统一语料库 (corpus_store.py)')
+    ap.add_argument('--queue', action='store_true',
+                    help='队列模式：链接入队到语料库文件中的 crawl_queue，本机多个进程共同领取 (不支持网络文件系统上的共享文件)，结果直接写入语料库')
+    ap.add_argument('--workers', type=int, default=1, help='队列模式下本机启动的抓取进程数')
+    profiling.add_arguments(ap)
+    args = ap.parse_args()
+    profiling.configure_from_args(args)
+
+    if args.queue:
+        args.store = args.store or STORE_FILE
+        run_queue(args)
+        return
+
     if not os.path.exists(INPUT_FILE):
         print(f"错误: 找不到 {INPUT_FILE}")
         return
@@ -189,6 +302,9 @@ def main():
     print(f"总共找到 {len(urls)} 个链接，开始处理...")
     
     all_data = []
+    store = CorpusStore(args.store) if args.store else None
+    pending = []
+    ignored = 0
 
     for idx, url in enumerate(urls):
         source = get_source_name(url)
@@ -228,9 +344,23 @@ def main():
                 
         except Exception as e:
             print(f"   [Error] 解析出错: {e}")
+            continue
+
+        # 批量写入语料库，每满一批提交一个事务 (写库出错直接中止，不当作解析错误)
+        if store and row_data:
+            pending.append({**row_data, 'corpus': get_corpus_name(source)})
+            if len(pending) >= STORE_BATCH:
+                ignored += store.insert_rows(pending)[1]
+                pending = []
+
+    if store:
+        if pending:
+            ignored += store.insert_rows(pending)[1]
+        print(f"语料库共 {len(store)} 条 (内容重复跳过 {ignored} 条): {args.store}")
+        store.close()
 
     # ============================
-    # 4. 数据整合与导出
+    # 5. 数据整合与导出
     # ============================
     
     if not all_data:
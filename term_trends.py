@@ -0,0 +1,186 @@
+"""
+增量词频趋势与突发词检测
+
+按 (来源, 时间桶) 维护整份词表的词频向量。新文档到来时只对新文档计数 (O(新文档))，
+不必对全语料重算；突发检测对整份词表一次向量化完成：
+某时间桶的词频率与前 window 个桶的均值/标准差比较得到 z 分数，输出每个来源的新兴词排名 (不含停用词)。
+最近一次传入的外部词表 (TokenCorpus.vocab 只追加不改动) 的编号映射会缓存，同一词表再次更新时只翻译新增的词。
+
+    trends = TermTrends(freq='M')
+    trends.update(df, tokens)                # df 含 Source/dt_date，tokens 为对齐的 TokenCorpus
+    trends.emerging(top_k=10)                # 每个来源最新时间桶的新兴词
+"""
+import json
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+from grouped_stats import time_bucket
+
+class TermTrends:
+    """(来源, 时间桶) -> 词频向量，可增量更新"""
+
+    def __init__(self, freq='M'):
+        self.freq = freq
+        self.vocab = []
+        self._index = {}
+        self.groups = []          # [(source, bucket)]
+        self._group_index = {}
+        self._counts = []         # 每组一个词频数组 (按词表增长延迟补齐)
+        self.doc_counts = []
+        self._lookup = None       # (最近一次的外部词表, 编号映射)
+
+    # ============================
+    # 1. 增量更新
+    # ============================
+
+    def _translate(self, vocab):
+        """外部词表编号 -> 本对象词表编号
+        与上次是同一个外部词表时沿用缓存，只翻译上次之后追加的词"""
+        cached = self._lookup
+        lookup = cached[1] if cached is not None and cached[0] is vocab else np.zeros(0, dtype=np.int64)
+        if len(lookup) > len(vocab):   # 词表被截短，重新翻译
+            lookup = lookup[:0]
+        if len(lookup) < len(vocab):
+            new = np.empty(len(vocab) - len(lookup), dtype=np.int64)
+            for i, word in enumerate(vocab[len(lookup):]):
+                j = self._index.get(word)
+                if j is None:
+                    j = self._index[word] = len(self.vocab)
+                    self.vocab.append(word)
+                new[i] = j
+            lookup = np.concatenate([lookup, new])
+        # 只保留最近一个词表，逐块传入的词表副本不会在此累积
+        self._lookup = (vocab, lookup)
+        return lookup
+
+    def _group(self, key):
+        g = self._group_index.get(key)
+        if g is None:
+            g = self._group_index[key] = len(self.groups)
+            self.groups.append(key)
+            self._counts.append(np.zeros(0, dtype=np.int64))
+            self.doc_counts.append(0)
+        return g
+
+    def update(self, df, tokens, source_col='Source', date_col='dt_date'):
+        """加入一批文档；tokens 为与 df 行对齐的 TokenCorpus"""
+        if len(df) == 0:
+            return self
+        lookup = self._translate(tokens.vocab)
+        buckets = time_bucket(df[date_col], self.freq)
+        keys = list(zip(df[source_col].astype(str), buckets))
+        doc_group = np.array([self._group(k) for k in keys], dtype=np.int64)
+
+        # (组, 词) 组合键一次计数
+        token_group = np.repeat(doc_group, tokens.lengths())
+        term = lookup[tokens.tokens]
+        combined, counts = np.unique(token_group * len(self.vocab) + term, return_counts=True)
+        groups_hit, terms_hit = np.divmod(combined, len(self.vocab))
+        for g in np.unique(groups_hit):
+            sel = groups_hit == g
+            self._grow(g)[terms_hit[sel]] += counts[sel]
+        for g, n in zip(*np.unique(doc_group, return_counts=True)):
+            self.doc_counts[g] += int(n)
+        return self
+
+    def _grow(self, g):
+        arr = self._counts[g]
+        if len(arr) < len(self.vocab):
+            arr = self._counts[g] = np.pad(arr, (0, len(self.vocab) - len(arr)))
+        return arr
+
+    # ============================
+    # 2. 查询
+    # ============================
+
+    def sources(self):
+        return sorted({s for s, _ in self.groups})
+
+    def matrix(self, source):
+        """某来源的 (时间桶列表, 桶 x 词 的词频矩阵)，中间缺失的桶补零"""
+        own = sorted((b, g) for g, (s, b) in enumerate(self.groups) if s == source and pd.notna(b))
+        if not own:
+            return pd.DatetimeIndex([]), np.zeros((0, len(self.vocab)), dtype=np.int64)
+        buckets = pd.DatetimeIndex([b for b, _ in own])
+        days = pd.Series(pd.date_range(buckets.min().normalize(), buckets.max(), freq='D'))
+        full = pd.DatetimeIndex(time_bucket(days, self.freq).unique())
+        full = full[(full >= buckets.min()) & (full <= buckets.max())]
+        M = np.zeros((len(full), len(self.vocab)), dtype=np.int64)
+        for row, (_, g) in zip(full.get_indexer(buckets), own):
+            M[row] = self._grow(g)
+        return full, M
+
+    # ============================
+    # 3. 突发检测 (整份词表向量化)
+    # ============================
+
+    def burst_scores(self, source, window=3, min_count=3):
+        """返回 (时间桶, 词频矩阵, z 分数矩阵)；z[t] 为第 t 个桶相对前 window 个桶的偏离程度"""
+        buckets, M = self.matrix(source)
+        totals = M.sum(axis=1, keepdims=True).astype(float)
+        rates = M / np.maximum(totals, 1.0)
+
+        # 滑动窗口的均值/方差用累计和一次求出
+        csum = np.vstack([np.zeros((1, M.shape[1])), np.cumsum(rates, axis=0)])
+        csq = np.vstack([np.zeros((1, M.shape[1])), np.cumsum(rates ** 2, axis=0)])
+        t = np.arange(len(buckets))
+        lo = np.maximum(t - window, 0)
+        n = (t - lo)[:, None].astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = (csum[t] - csum[lo]) / n
+            var = np.maximum((csq[t] - csq[lo]) / n - mean ** 2, 0.0)
+            # 方差下限取泊松噪声，避免基线为零时 z 分数无穷大
+            noise = np.maximum(mean, 1.0 / np.maximum(totals, 1.0)) / np.maximum(totals, 1.0)
+            z = (rates - mean) / np.sqrt(var + noise)
+        z[n[:, 0] == 0] = 0.0
+        z[M < min_count] = 0.0
+        return buckets, M, np.nan_to_num(z)
+
+    def emerging(self, top_k=10, window=3, min_count=3, bucket=None, exclude=ENGLISH_STOP_WORDS):
+        """每个来源在指定时间桶 (默认各自最新的桶) 的新兴词排名；exclude 中的词 (默认英文停用词) 不参与"""
+        vocab = np.array(self.vocab, dtype=object)
+        excluded = np.isin(vocab, list(exclude)) if exclude else np.zeros(len(vocab), dtype=bool)
+        rows = []
+        for source in self.sources():
+            buckets, M, z = self.burst_scores(source, window, min_count)
+            if not len(buckets):
+                continue
+            z[:, excluded] = 0.0
+            t = len(buckets) - 1 if bucket is None else buckets.get_indexer([pd.Timestamp(bucket)])[0]
+            if t < 0:
+                continue
+            top = np.argsort(-z[t], kind='stable')[:top_k]
+            for rank, j in enumerate(top, start=1):
+                if z[t, j] <= 0:
+                    break
+                rows.append({'source': source, 'bucket': buckets[t], 'rank': rank, 'term': vocab[j],
+                             'count': int(M[t, j]), 'z': round(float(z[t, j]), 2)})
+        return pd.DataFrame(rows, columns=['source', 'bucket', 'rank', 'term', 'count', 'z'])
+
+    # ============================
+    # 4. 持久化
+    # ============================
+
+    def save(self, path):
+        """保存为 .npz (词频矩阵) + 同名 .json (词表/分组)"""
+        M = np.vstack([self._grow(g) for g in range(len(self.groups))]) if self.groups else np.zeros((0, 0))
+        np.savez_compressed(path, counts=M, doc_counts=np.array(self.doc_counts, dtype=np.int64))
+        meta = {'freq': self.freq, 'vocab': self.vocab,
+                'groups': [[s, None if pd.isna(b) else str(b)] for s, b in self.groups]}
+        with open(path + '.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path + '.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = np.load(path if path.endswith('.npz') else path + '.npz')
+        trends = cls(meta['freq'])
+        trends._translate(meta['vocab'])
+        for (s, b), row, n in zip(meta['groups'], arrays['counts'], arrays['doc_counts']):
+            g = trends._group((s, pd.NaT if b is None else pd.Timestamp(b)))
+            trends._counts[g] = row.astype(np.int64)
+            trends.doc_counts[g] = int(n)
+        return trends
@@ -0,0 +1,66 @@
+"""聚合立方体：增量更新幂等、分块结果与一次构建一致、CSV 立方体拒绝增量更新"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregate_cube import ALL_TERMS, CSV_SOURCE, KEY_TERMS, AggregateCube
+from corpus_store import CorpusStore
+
+ROWS = [
+    {'Source': 'Reuters', 'Date': '2025-04-03', 'Content': 'Nvidia shares fell after new export controls on the H20.'},
+    {'Source': 'Reuters', 'Date': '2025-04-20', 'Content': 'Nvidia and AMD warned about tariffs. Nvidia again.'},
+    {'Source': 'CNN', 'Date': '2025-05-02', 'Content': 'Huawei was added to the Entity List.'},
+    {'Source': 'CNN', 'Date': '2025-05-09', 'Content': 'A quiet week with good news for markets.'},
+    {'Source': 'CNN', 'Date': None, 'Content': 'TSMC expands advanced packaging capacity.'},
+]
+
+@pytest.fixture
+def store(tmp_path):
+    with CorpusStore(str(tmp_path / 'c.db')) as s:
+        s.insert_rows(ROWS[:3], 'media')
+        yield s
+
+def _cells(cube):
+    frame = cube.cells.astype({d: str for d in ['corpus', 'source', 'month', 'term']})
+    return frame.sort_values(['corpus', 'source', 'month', 'term'], ignore_index=True)
+
+def test_terms_limited_to_dictionary(store):
+    cube = AggregateCube()
+    cube.update_from_store(store)
+    assert set(cube.cells['term'].astype(str)) <= set(KEY_TERMS) | {ALL_TERMS}
+    res = cube.query(term='Nvidia', corpus='media', by=['source'])
+    # 同一文档多次提及只计一次
+    assert res.loc['Reuters', 'docs'] == 2 and res.loc['Reuters', 'share'] == 1.0
+
+def test_store_update_is_idempotent(store, tmp_path):
+    cube = AggregateCube()
+    assert cube.update_from_store(store) == 3
+    path = str(tmp_path / 'cube.json.gz')
+    cube.save(path)
+    cube = AggregateCube.load(path)
+    before = _cells(cube)
+    assert cube.update_from_store(store) == 0
+    pd.testing.assert_frame_equal(_cells(cube), before)
+
+    # 新文档只并入一次；分块增量与一次全量构建一致
+    store.insert_rows(ROWS[3:], 'media')
+    assert cube.update_from_store(store, chunksize=1) == 2
+    assert cube.update_from_store(store, chunksize=1) == 0
+    whole = AggregateCube()
+    whole.update_from_store(store)
+    a, b = _cells(cube), _cells(whole)
+    pd.testing.assert_frame_equal(a.drop(columns=['sent_sum', 'sent_sq']), b.drop(columns=['sent_sum', 'sent_sq']))
+    np.testing.assert_allclose(a[['sent_sum', 'sent_sq']], b[['sent_sum', 'sent_sq']])
+    assert cube.watermark == whole.watermark
+
+def test_csv_cube_refuses_store_update(store):
+    cube = AggregateCube(source=CSV_SOURCE).update(pd.DataFrame(ROWS), corpus='media')
+    with pytest.raises(ValueError):
+        cube.update_from_store(store)
+
+def test_other_store_refused(store, tmp_path):
+    cube = AggregateCube()
+    cube.update_from_store(store)
+    with CorpusStore(str(tmp_path / 'other.db')) as other:
+        with pytest.raises(ValueError):
+            cube.update_from_store(other)
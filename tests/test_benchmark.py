@@ -0,0 +1,37 @@
+"""基准测试：回归判断 (阈值、噪声下限、基线缺失的阶段) 与合成语料可复现"""
+import pandas as pd
+
+from benchmark import MIN_SECONDS, CorpusModel, find_regressions, make_report
+
+def _report(*rows):
+    return make_report([{'corpus': 'think_tank', 'scale': 1.0, 'stage': stage, 'seconds': seconds}
+                        for stage, seconds in rows], seed=42)
+
+def test_find_regressions_uses_threshold():
+    baseline = _report(('sentiment', 1.0), ('network', 1.0), ('render', 1.0))
+    report = _report(('sentiment', 1.2), ('network', 1.4), ('render', 0.5))
+    regressions = find_regressions(report, baseline, threshold=1.25)
+    assert [r['stage'] for r in regressions] == ['network']
+    assert regressions[0]['baseline_seconds'] == 1.0 and regressions[0]['ratio'] == 1.4
+
+def test_find_regressions_skips_noise_and_new_stages():
+    tiny = MIN_SECONDS / 10
+    baseline = _report(('clean_text', tiny), ('layout', tiny))
+    # 两次都低于噪声下限的不算；任一次超过下限则照常比较
+    report = _report(('clean_text', tiny * 5), ('layout', MIN_SECONDS * 2), ('render', 10.0))
+    assert [r['stage'] for r in find_regressions(report, baseline, threshold=1.25)] == ['layout']
+    # 基线中没有的阶段/规模不算回归
+    other_scale = {'results': [{**r, 'scale': 10.0} for r in baseline['results']]}
+    assert find_regressions(report, other_scale, threshold=1.25) == []
+
+def test_synthetic_corpus_is_reproducible():
+    model = CorpusModel(pd.DataFrame({
+        'Source': ['A', 'B', None],
+        'Date': ['2025-01-02', 'March 3, 2025', '2025-02-01'],
+        'Content': ['Chips, chips and export controls.', 'Tariffs rose.', None],
+    }))
+    df = model.generate(20, seed=7)
+    assert list(df.columns) == ['Source', 'Date', 'Content'] and len(df) == 20
+    assert set(df['Source']) <= {'A', 'B'}
+    assert set(' '.join(df['Content']).split()) <= set(model.vocab)
+    pd.testing.assert_frame_equal(df, model.generate(20, seed=7))
@@ -0,0 +1,32 @@
+"""自助法置信区间：样本不足的组不给区间，分块更新的 n / mean 与一次更新一致"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bootstrap import MIN_N, BootstrapMeans, bootstrap_ci
+
+def test_sparse_groups_have_no_interval():
+    rng = np.random.default_rng(0)
+    keys = ['a'] * 50 + ['b'] * MIN_N + ['c'] * (MIN_N - 1)
+    values = rng.normal(size=len(keys))
+    res = bootstrap_ci(values, keys, n_boot=200)
+    assert list(res['n']) == [50, MIN_N, MIN_N - 1]
+    assert res.loc[['a', 'b'], ['se', 'lo', 'hi']].notna().all().all()
+    assert res.loc['a', 'lo'] < res.loc['a', 'mean'] < res.loc['a', 'hi']
+    assert res.loc['c', ['se', 'lo', 'hi']].isna().all()
+    assert res.loc['c', 'mean'] == pytest.approx(values[-(MIN_N - 1):].mean())
+    # min_n=1 时单篇的组区间退化为一个点
+    single = bootstrap_ci(values[:1], ['c'], n_boot=200, min_n=1).loc['c']
+    assert single['lo'] == pytest.approx(single['hi']) == pytest.approx(values[0], rel=1e-6)
+
+def test_chunked_update_matches_whole():
+    rng = np.random.default_rng(1)
+    keys = rng.choice(list('xyz'), size=300)
+    values = rng.normal(size=300)
+    boot = BootstrapMeans(n_boot=100, block_elements=1000)
+    for start in range(0, 300, 37):
+        boot.update(values[start:start + 37], keys[start:start + 37])
+    chunked = boot.result().sort_index()
+    whole = bootstrap_ci(values, keys, n_boot=100)
+    pd.testing.assert_series_equal(chunked['n'], whole['n'])
+    np.testing.assert_allclose(chunked['mean'], whole['mean'])
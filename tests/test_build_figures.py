@@ -0,0 +1,55 @@
+import ast
+import functools
+
+import pytest
+
+import build_figures
+
+def test_local_modules_are_transitive(tmp_path):
+    (tmp_path / 'a.py').write_text('import b\nimport numpy\n')
+    (tmp_path / 'b.py').write_text('def f():\n    from c import g\n')
+    (tmp_path / 'c.py').write_text('g = 1\n')
+    tree = ast.parse('import os\nfrom a import x\n')
+    found = build_figures.local_modules(tree, root_dir=str(tmp_path))
+    assert [p.rsplit('/', 1)[1] for p in found] == ['a.py', 'b.py', 'c.py']
+
+def test_fingerprint_tracks_imported_modules():
+    figures = build_figures.discover_figures()
+    assert any(m.endswith('text_index.py') for m in figures['3_4']['modules'])
+
+def test_render_reports_sys_exit(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)   # render_figure 会切换工作目录
+    script = tmp_path / 'bad.py'
+    script.write_text('import sys\nsys.exit(2)\n')
+    with pytest.raises(RuntimeError, match=r'sys\.exit\(2\)'):
+        build_figures.render_figure(str(script), str(tmp_path))
+
+FIGURE = 'import matplotlib.pyplot as plt\nplt.plot([0, {}])\nplt.savefig("fig.png")\n'
+
+def test_build_skips_up_to_date_figures(tmp_path, monkeypatch, capsys):
+    figure_dir, output_dir = tmp_path / 'vis', tmp_path / 'out'
+    figure_dir.mkdir()
+    script = figure_dir / 'f.py'
+    script.write_text(FIGURE.format(1))
+    discover = functools.partial(build_figures.discover_figures, figure_dir=str(figure_dir))
+    monkeypatch.setattr(build_figures, 'discover_figures', discover)
+
+    assert build_figures.build(output_dir=str(output_dir), jobs=1) == 0
+    state = build_figures.load_state(str(output_dir))
+    figure = discover()['f']
+    assert state == {'f': build_figures.fingerprint(figure)}
+    assert build_figures.is_up_to_date('f', figure, state['f'], state, str(output_dir))
+    capsys.readouterr()
+
+    # 指纹未变、输出齐全 -> 跳过
+    assert build_figures.build(output_dir=str(output_dir), jobs=1) == 0
+    assert '[Skip] f' in capsys.readouterr().out
+
+    # 脚本改动或输出缺失 -> 重绘
+    script.write_text(FIGURE.format(2))
+    assert not build_figures.is_up_to_date('f', figure, build_figures.fingerprint(figure), state, str(output_dir))
+    build_figures.build(output_dir=str(output_dir), jobs=1)
+    assert '[Done] f' in capsys.readouterr().out
+    (output_dir / 'fig.png').unlink()
+    build_figures.build(output_dir=str(output_dir), jobs=1)
+    assert '[Done] f' in capsys.readouterr().out and (output_dir / 'fig.png').exists()
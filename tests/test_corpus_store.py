@@ -0,0 +1,25 @@
+"""语料库去重：按 (语料, 内容) 唯一，空正文不去重，重复导入幂等"""
+from corpus_store import CorpusStore
+
+ROWS = [
+    {'Source': 'A', 'Date': '2025-01-02', 'Content': 'chip export rules tightened'},
+    {'Source': 'B', 'Date': '2025-01-03', 'Content': 'chip export rules tightened'},
+    {'Source': 'C', 'Date': '2025-01-04', 'Content': ''},
+    {'Source': 'D', 'Date': '2025-01-05', 'Content': None},
+]
+
+def test_dedup_is_per_corpus_and_skips_empty(tmp_path):
+    with CorpusStore(str(tmp_path / 'c.db')) as store:
+        assert store.insert_rows(ROWS, 'media') == (3, 1)
+        # 另一语料中的相同内容照常保留
+        assert store.insert_rows(ROWS[:1], 'think_tank') == (1, 0)
+        assert len(store) == 4
+
+def test_reimport_is_idempotent(tmp_path):
+    path = tmp_path / 'media.csv'
+    path.write_text('Source,Date,Content\nA,2025-01-02,one\nB,2025-01-03,two\nC,2025-01-04,two\n',
+                    encoding='utf-8')
+    with CorpusStore(str(tmp_path / 'c.db')) as store:
+        assert store.import_csv(str(path), 'media') == (2, 1)
+        assert store.import_csv(str(path), 'media') == (0, 3)
+        assert len(store) == 2
@@ -0,0 +1,61 @@
+"""抓取队列：入队幂等、租约过期后重领、旧租约无法提交、重试次数用完即失败"""
+import pytest
+
+import crawl_queue
+from crawl_queue import CrawlQueue, LeaseLost
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(crawl_queue, 'domain_delay', lambda domain: 0.0)
+    with CrawlQueue(str(tmp_path / 'q.db'), owner='test') as q:
+        yield q
+
+def _expire(queue, task):
+    with queue.conn:
+        queue.conn.execute('UPDATE crawl_queue SET lease_expires = 0 WHERE id = ?', (task['id'],))
+
+def _status(queue, task):
+    return queue.conn.execute('SELECT status FROM crawl_queue WHERE id = ?', (task['id'],)).fetchone()[0]
+
+def test_enqueue_is_idempotent(queue):
+    urls = ['https://www.a.com/1', 'https://a.com/2', 'https://www.a.com/1']
+    assert queue.enqueue(urls) == 2
+    assert queue.enqueue(urls) == 0
+    assert queue.remaining() == 2
+
+def test_expired_lease_is_reclaimed_and_old_token_rejected(queue):
+    queue.enqueue(['https://a.com/1'])
+    first, _ = queue.claim()
+    assert queue.claim() == (None, pytest.approx(crawl_queue.LEASE_SECONDS, abs=5))
+    _expire(queue, first)
+    second, _ = queue.claim()
+    assert second['id'] == first['id'] and second['attempt'] == 2
+    with pytest.raises(LeaseLost):
+        queue.complete(first, {'Content': 'stale'}, corpus='media')
+    doc_id = queue.complete(second, {'Content': 'fresh'}, corpus='media')
+    assert len(queue.store) == 1 and doc_id is not None
+    # 已完成的链接不会再被领取，重复提交也被拒绝
+    assert queue.claim() == (None, None)
+    with pytest.raises(LeaseLost):
+        queue.complete(second, {'Content': 'fresh'}, corpus='media')
+    assert len(queue.store) == 1
+
+def test_expired_lease_fails_after_max_attempts(queue):
+    queue.enqueue(['https://a.com/1'])
+    for attempt in range(1, 4):
+        task, _ = queue.claim(max_attempts=3)
+        assert task['attempt'] == attempt
+        _expire(queue, task)
+    assert queue.claim(max_attempts=3) == (None, None)
+    assert _status(queue, task) == 'failed'
+    assert queue.retry_failed() == 1
+
+def test_fail_backs_off_then_gives_up(queue):
+    queue.enqueue(['https://a.com/1'])
+    task, _ = queue.claim()
+    assert queue.fail(task, 'boom', max_attempts=2) == 'pending'
+    with queue.conn:
+        queue.conn.execute('UPDATE crawl_queue SET available_at = 0')
+    task, _ = queue.claim()
+    assert queue.fail(task, 'boom', max_attempts=2) == 'failed'
+    assert queue.remaining() == 0
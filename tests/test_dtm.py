@@ -0,0 +1,52 @@
+"""DTM 缓存：指纹一致时直接读缓存，语料或切词规则变化时重建，内存映射读回与原矩阵一致"""
+import numpy as np
+
+import dtm as dtm_cache
+from dtm import DocumentTermMatrix
+
+TEXTS = ['chip export controls', 'export controls tightened again', 'chip chip packaging']
+CONFIG = {'source': 'v1'}
+
+def _builder(texts, calls):
+    def build():
+        calls.append(1)
+        return DocumentTermMatrix.from_texts(texts, str.split)
+    return build
+
+def _load(tmp_path, texts, config, calls):
+    return dtm_cache.load_or_build('t', _builder(texts, calls), dtm_cache.texts_key(texts), config,
+                                   cache_dir=str(tmp_path))
+
+def test_cache_hit_and_rebuild(tmp_path):
+    calls = []
+    first = _load(tmp_path, TEXTS, CONFIG, calls)
+    again = _load(tmp_path, TEXTS, CONFIG, calls)
+    assert len(calls) == 1
+    assert again.meta['fingerprint'] == first.meta['fingerprint']
+
+    # 语料变化 / 切词规则变化都会重建，旧缓存被清理
+    _load(tmp_path, TEXTS + ['new document'], CONFIG, calls)
+    assert len(calls) == 2
+    rebuilt = _load(tmp_path, TEXTS, {'source': 'v2'}, calls)
+    assert len(calls) == 3
+    assert [p.name for p in tmp_path.iterdir()] == [f"t-{rebuilt.meta['fingerprint']}"]
+
+def test_source_key_tracks_function_source():
+    def a(text):
+        return text.split()
+    def b(text):
+        return text.lower().split()
+    assert dtm_cache.source_key(a) == dtm_cache.source_key(a)
+    assert dtm_cache.source_key(a) != dtm_cache.source_key(b)
+
+def test_mmap_round_trip(tmp_path):
+    dtm = DocumentTermMatrix.from_texts(TEXTS, str.split)
+    path = str(tmp_path / 'm')
+    dtm.save(path)
+    loaded = DocumentTermMatrix.load(path)
+    # 只读内存映射 (scipy 包一层 ndarray 视图，但不复制、不可写)
+    assert not any(getattr(loaded.X, name).flags.writeable for name in dtm_cache.ARRAYS)
+    assert DocumentTermMatrix.load(path, mmap=False).X.data.flags.writeable
+    assert list(loaded.vocab) == list(dtm.vocab)
+    np.testing.assert_array_equal(loaded.X.toarray(), dtm.X.toarray())
+    assert loaded.term_counts()[loaded.term_index()['chip']] == 3
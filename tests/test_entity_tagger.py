@@ -0,0 +1,44 @@
+"""实体标注：词边界、大小写敏感缩写、最左最长、并行与串行一致"""
+import pandas as pd
+
+from entity_tagger import EntityTagger, co_mentions, mentions_any, tag_corpus
+
+TAGGER = EntityTagger()
+
+def _entities(text):
+    return [h.entity for h in TAGGER.tag(text)]
+
+def test_word_boundaries_and_aliases():
+    assert _entities('This year the ear of the market') == []
+    assert _entities('NVIDIA Corp and Lam Research rallied') == ['Nvidia', 'Lam Research']
+    assert _entities('high-bandwidth memory demand') == ['HBM']
+    hit = TAGGER.tag('Shares of Taiwan Semiconductor rose')[0]
+    assert (hit.entity, hit.surface) == ('TSMC', 'Taiwan Semiconductor')
+
+def test_case_sensitive_abbreviations():
+    assert _entities('Under the EAR, exports need a license') == ['EAR']
+    assert _entities('Keep an ear on the bis rules') == []
+    assert _entities('the Export Administration Regulations') == ['EAR']
+    assert _entities('Intel shares and military intel') == ['Intel']
+
+def test_mentions_any():
+    texts = ['Nvidia GPUs', 'weather report', None, 'a quiet ear']
+    assert mentions_any(texts).tolist() == [True, False, False, False]
+    assert mentions_any(texts, entities=['GPU']).tolist() == [True, False, False, False]
+    assert mentions_any(texts, entities=['EAR']).tolist() == [False] * 4
+
+def test_leftmost_longest_without_overlap():
+    assert _entities('added to the Entity List') == ['Entity List']
+    assert _entities('Taiwan Semiconductor Manufacturing Company results') == ['TSMC']
+    hits = TAGGER.tag('Samsung Electronics and SK Hynix')
+    assert [(h.entity, h.surface) for h in hits] == [('Samsung', 'Samsung Electronics'), ('SK Hynix', 'SK Hynix')]
+
+def test_parallel_matches_serial():
+    texts = ['Nvidia H20 export controls', None, 'Huawei on the Entity List', 'nothing here',
+             'Tariffs hit Intel and AMD', 'CHIPS and Science Act funds Micron'] * 7
+    serial = tag_corpus(texts, chunksize=4)
+    parallel = tag_corpus(texts, jobs=2, chunksize=4)
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert set(serial['doc']) == {i for i, t in enumerate(texts) if t and t != 'nothing here'}
+    pairs = co_mentions(serial)
+    assert pairs.loc[(pairs['entity_a'] == 'AMD') & (pairs['entity_b'] == 'Intel'), 'docs'].item() == 7
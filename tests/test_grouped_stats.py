@@ -0,0 +1,39 @@
+"""分组统计：分块累加、跨累加器合并与整表一次计算的结果一致"""
+import numpy as np
+import pandas as pd
+
+from grouped_stats import GroupedStats
+
+def _frame(n=240, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Source': rng.choice(['CNN', 'Reuters', 'WSJ'], size=n),
+        'dt_date': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 300, size=n), unit='D'),
+        'sentiment': rng.normal(0.05, 0.2, size=n),
+        'Content': rng.choice(['Nvidia export control news', 'weather report', 'tariff talk'], size=n),
+    })
+
+def _assert_same(a, b):
+    pd.testing.assert_frame_equal(a.sort_index(), b.sort_index(), check_exact=False, rtol=1e-9, atol=1e-12)
+
+def test_chunked_and_merged_match_whole():
+    df = _frame()
+    whole = GroupedStats().update(df)
+
+    chunked = GroupedStats()
+    for start in range(0, len(df), 23):
+        chunked.update(df.iloc[start:start + 23])
+    _assert_same(chunked.result(), whole.result())
+
+    # 两个 "进程" 各处理一半再合并
+    left, right = GroupedStats().update(df.iloc[::2]), GroupedStats().update(df.iloc[1::2])
+    _assert_same(left.merge(right).result(), whole.result())
+    _assert_same(left.rollup('source'), whole.rollup('source'))
+
+def test_matches_pandas_groupby():
+    df = _frame(seed=1)
+    res = GroupedStats().update(df).rollup('source')
+    expected = df.groupby('Source')['sentiment'].agg(['size', 'mean', lambda s: s.var(ddof=0)])
+    np.testing.assert_array_equal(res['count'].to_numpy(), expected['size'].to_numpy())
+    np.testing.assert_allclose(res['mean'].to_numpy(), expected['mean'].to_numpy())
+    np.testing.assert_allclose(res['variance'].to_numpy(), expected.iloc[:, 2].to_numpy())
@@ -0,0 +1,17 @@
+import subprocess
+import sys
+
+SCRIPT = """
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+before = dict(plt.rcParams)
+import analysis
+changed = [k for k, v in plt.rcParams.items() if before[k] != v]
+print(len(changed))
+"""
+
+def test_importing_analysis_keeps_rcparams():
+    out = subprocess.run([sys.executable, '-c', SCRIPT], capture_output=True, text=True, check=True,
+                         cwd=__file__.rsplit('/tests/', 1)[0])
+    assert out.stdout.strip() == '0'
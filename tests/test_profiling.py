@@ -0,0 +1,92 @@
+"""剖析钩子：关闭时直接透传、嵌套阶段峰值内存、折叠栈输出、进程池子进程写出各自的阶段统计"""
+import argparse
+import io
+import json
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import profiling
+
+@pytest.fixture
+def clean_profiling(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, '_settings', profiling._Settings())
+    monkeypatch.setattr(profiling, '_records', {})
+    monkeypatch.setattr(profiling, '_report_registered', True)   # 测试中不注册 atexit
+    monkeypatch.setattr(profiling, '_profiler', None)
+    monkeypatch.setattr(profiling, '_sampler', None)
+    monkeypatch.setattr(profiling, '_thread_stages', {})
+    yield tmp_path
+    if profiling._sampler is not None:
+        profiling._sampler.stopped = True
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def test_disabled_stage_is_passthrough(clean_profiling):
+    @profiling.stage('work')
+    def work(x, y=1):
+        return x + y
+    assert work(1, y=2) == 3
+    with profiling.stage('block'):
+        pass
+    assert profiling.summary() == {} and profiling.settings() is None
+
+def test_nested_peak_is_propagated_to_outer(clean_profiling):
+    profiling.configure(trace_malloc=True, out_dir=str(clean_profiling))
+    with profiling.stage('outer'):
+        with profiling.stage('inner'):
+            block = bytearray(8 << 20)
+            del block
+        with profiling.stage('small'):
+            pass
+    stats = profiling.summary()
+    assert stats['inner']['peak_bytes'] >= 8 << 20
+    assert stats['small']['peak_bytes'] < 1 << 20
+    # reset_peak 之后外层阶段仍记得内层的峰值
+    assert stats['outer']['peak_bytes'] >= stats['inner']['peak_bytes']
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def test_sample_mode_writes_collapsed_stacks(clean_profiling):
+    profiling.configure('sample', out_dir=str(clean_profiling))
+    with profiling.stage('outer'):
+        with profiling.stage('inner'):
+            _busy(0.3)
+    profiling.report(stream=io.StringIO())
+    lines = (clean_profiling / 'stacks.collapsed').read_text(encoding='utf-8').splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(' ', 1)
+        assert stack.startswith('outer;') and int(count) >= 1
+    assert any(line.startswith('outer;inner;') and ':_busy' in line for line in lines)
+
+def test_profile_dir_applies_when_enabled_from_env(clean_profiling):
+    profiling.configure_from_env({'DJ_TRACEMALLOC': '1'})
+    parser = argparse.ArgumentParser()
+    profiling.add_arguments(parser)
+    profiling.configure_from_args(parser.parse_args(['--profile-dir', str(clean_profiling / 'out')]))
+    assert profiling.settings() == {'mode': None, 'trace_malloc': True, 'out_dir': str(clean_profiling / 'out')}
+
+def _pool_task(settings):
+    profiling.configure(**settings)
+    with profiling.stage('fetch'):
+        pass
+    profiling.report_worker()
+    return os.getpid()
+
+def test_pool_workers_write_their_own_stats(clean_profiling):
+    profiling.configure(trace_malloc=True, out_dir=str(clean_profiling / 'prof'))
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        pids = set(pool.map(_pool_task, [profiling.settings()] * 2))
+    for pid in pids:
+        with open(clean_profiling / 'prof' / f'stages-{pid}.json', encoding='utf-8') as f:
+            assert json.load(f)['fetch']['calls'] >= 1
+    # 主进程中 report_worker 不输出 (由 atexit 负责)
+    profiling.report_worker()
+    assert not os.path.exists(clean_profiling / 'prof' / 'stages.json')
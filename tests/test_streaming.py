@@ -0,0 +1,46 @@
+"""分块流式路径与整表路径的结果必须一致"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import analysis
+
+CHUNK = 17
+
+@pytest.fixture(scope='module')
+def frames():
+    df_media, df_think, df_expert = analysis.load_and_clean_data()
+    tokens = [analysis.featurize(df) for df in (df_media, df_think, df_expert)]
+    df_media = analysis.process_dates(df_media, 'Date')
+    df_think = analysis.process_dates(df_think, 'Date')
+    return {'media': (df_media, tokens[0]), 'think': (df_think, tokens[1]), 'expert': (df_expert, tokens[2])}
+
+def _edges(G):
+    return {tuple(sorted(e[:2])): e[2]['weight'] for e in G.edges(data=True)}
+
+@pytest.mark.parametrize('name,path,top_n', [
+    ('think', analysis.THINK_TANK_FILE, 30),
+    ('expert', analysis.EXPERT_FILE, 35),
+])
+def test_stream_network_matches_in_memory(frames, name, path, top_n):
+    df, tokens = frames[name]
+    G_mem = analysis.build_advanced_network(df, top_n=top_n, tokens=tokens)
+    G_stream = analysis.stream_network(path, top_n=top_n, chunksize=CHUNK)
+    assert sorted(G_mem.nodes) == sorted(G_stream.nodes)
+    assert _edges(G_mem) == _edges(G_stream)
+
+def test_stream_monthly_sentiment_matches_resample(frames):
+    df, _ = frames['media']
+    expected = df.set_index('dt_date').resample(analysis.MONTH_FREQ)['sentiment'].mean()
+    series, bands = analysis.stream_monthly_sentiment(analysis.MEDIA_FILE, chunksize=CHUNK)
+    np.testing.assert_allclose(series.to_numpy(), expected.to_numpy())
+    assert (series.index == expected.index).all()
+    in_memory = analysis.monthly_bands(df).reindex(expected.index)
+    pd.testing.assert_series_equal(bands['n'], in_memory['n'], check_names=False, check_dtype=False)
+
+def test_sentiment_histogram_is_bounded_and_exact(frames):
+    df, _ = frames['expert']
+    centers, counts, mean = analysis.stream_sentiment_histogram(analysis.EXPERT_FILE, chunksize=CHUNK)
+    assert len(counts) == len(analysis.SENTIMENT_BINS) - 1
+    assert counts.sum() == len(df)
+    assert mean == pytest.approx(df['sentiment'].mean())
@@ -0,0 +1,51 @@
+"""增量词频：分批更新与一次更新一致，词表映射只增量翻译，新兴词不含停用词"""
+import numpy as np
+import pandas as pd
+
+from term_trends import TermTrends
+from token_corpus import TokenCorpus
+
+def _frame(n, start):
+    return pd.DataFrame({'Source': ['A'] * n,
+                         'dt_date': pd.date_range(start, periods=n, freq='7D')})
+
+DOCS = [['chip', 'the', 'export'], ['chip', 'tariff'], ['the', 'the', 'rule'], ['tariff', 'chip']] * 6
+
+def test_incremental_matches_batch():
+    df = _frame(len(DOCS), '2025-01-01')
+    whole = TermTrends().update(df, TokenCorpus.from_token_lists(DOCS))
+
+    corpus = TokenCorpus()
+    parts = TermTrends()
+    for start in range(0, len(DOCS), 5):
+        docs = corpus.extend(DOCS[start:start + 5])
+        # subset 与整体共用同一个 (不断追加的) 词表对象
+        parts.update(df.iloc[start:start + 5], corpus.subset(list(docs)))
+
+    for source in whole.sources():
+        b1, m1 = whole.matrix(source)
+        b2, m2 = parts.matrix(source)
+        assert b1.equals(b2)
+        order = [parts.vocab.index(w) for w in whole.vocab]
+        assert np.array_equal(m1, m2[:, order])
+
+def test_translate_extends_cached_lookup():
+    trends = TermTrends()
+    vocab = ['a', 'b']
+    first = trends._translate(vocab)
+    vocab.append('c')
+    second = trends._translate(vocab)
+    assert list(second[:2]) == list(first) and trends.vocab == ['a', 'b', 'c']
+    assert trends._lookup[1] is second
+    # 换一个词表后只保留最近的映射
+    trends._translate(['c', 'd'])
+    assert trends._lookup[0] is not vocab and trends.vocab == ['a', 'b', 'c', 'd']
+
+def test_emerging_skips_stop_words():
+    docs = [['chip']] * 12 + [['the'] * 20 + ['tariff'] * 20] * 3
+    df = pd.DataFrame({'Source': 'A', 'dt_date': pd.to_datetime(
+        ['2025-01-15'] * 4 + ['2025-02-15'] * 4 + ['2025-03-15'] * 4 + ['2025-04-15'] * 3)})
+    trends = TermTrends().update(df, TokenCorpus.from_token_lists(docs))
+    terms = set(trends.emerging(top_k=5)['term'])
+    assert 'tariff' in terms and 'the' not in terms
+    assert 'the' in set(trends.emerging(top_k=5, exclude=())['term'])
@@ -0,0 +1,65 @@
+"""倒排索引：内容变化时重新索引、源中删除的文档移出索引、日期规范化与按日期过滤"""
+import pytest
+
+from text_index import InvertedIndex, entity_query
+
+DOCS = [
+    {'doc_key': 'a', 'corpus': 'media', 'source': 'CNN', 'date': 'Published March 27, 2025',
+     'content': 'Huawei was added to the Entity List'},
+    {'doc_key': 'b', 'corpus': 'media', 'source': 'CNN', 'date': '2025-06-02T10:00:00Z',
+     'content': 'New export controls on Huawei and Nvidia'},
+    {'doc_key': 'c', 'corpus': 'think_tank', 'source': 'CSIS', 'date': None,
+     'content': 'Entity List additions explained'},
+]
+
+@pytest.fixture
+def index(tmp_path):
+    idx = InvertedIndex(str(tmp_path / 'idx.db'))
+    assert idx.add_documents(DOCS) == 3
+    yield idx
+    idx.close()
+
+def test_unchanged_docs_are_skipped(index):
+    assert index.add_documents(DOCS) == 0
+    assert len(index) == 3
+
+def test_changed_content_is_reindexed(index):
+    a = index.search(all_of=['entity list'], corpus='media')
+    assert index.add_documents([{**DOCS[0], 'content': 'completely different text'}]) == 1
+    assert len(index) == 3
+    assert index.docs('completely') == a
+    assert index.search(all_of=['entity list'], corpus='media') == set()
+    assert index.docs('huawei') == index.search(all_of=['nvidia'])
+
+def test_missing_docs_are_removed(index):
+    assert index.remove_missing('media', {'b'}) == 1
+    assert len(index) == 2
+    assert index.count(all_of=['entity list']) == 1
+    assert index.count(all_of=['huawei']) == 1
+
+def test_first_occurrence_of_duplicate_key_wins(index):
+    dup = [{**DOCS[1], 'doc_key': 'd'}, {**DOCS[1], 'doc_key': 'd', 'content': 'other'}]
+    assert index.add_documents(dup) == 1
+    assert index.docs('other') == set()
+
+def test_dates_are_normalized_and_filterable(index):
+    dates = dict(index.conn.execute('SELECT doc_key, date FROM docs'))
+    assert dates == {'a': '2025-03-27 00:00:00', 'b': '2025-06-02 10:00:00', 'c': None}
+    assert index.count(all_of=['huawei'], start='2025-04') == 1
+    assert index.count(all_of=['huawei'], end='2025-03') == 1
+    assert index.count(all_of=['huawei'], start='2025-06-02', end='2025-06-02') == 1
+    # 按日期过滤时日期缺失的文档排除
+    assert index.count(all_of=['entity list'], start='2025') == 1
+    m = index.matrix({'H': ['huawei']}, {'EL': ['entity list'], 'N': ['nvidia']}, end='2025-05')
+    assert m.loc['H'].tolist() == [1, 0]
+
+def test_entity_postings_follow_dictionary(index):
+    index.add_documents([
+        {'doc_key': 'e1', 'corpus': 'media', 'content': 'Licenses under the EAR were tightened'},
+        {'doc_key': 'e2', 'corpus': 'media', 'content': 'Lend me your ear about the Export Administration Regulations'},
+        {'doc_key': 'e3', 'corpus': 'media', 'content': 'An ear for music'},
+    ])
+    ear = index.docs(entity_query('EAR'))
+    assert len(ear) == 2 and index.docs('ear') >= ear and len(index.docs('ear')) == 3
+    assert index.count(any_of=[entity_query('Entity List')]) == 2
+    assert index.count(all_of=[entity_query('Huawei'), entity_query('Entity List')]) == 1
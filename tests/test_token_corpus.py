@@ -0,0 +1,37 @@
+"""整数词元语料：子集、稀疏词频矩阵、分块复用时词表共享"""
+import numpy as np
+
+from token_corpus import TokenCorpus
+
+DOCS = [['chip', 'export', 'chip'], [], ['tariff'], ['export', 'rule', 'chip']]
+
+def test_subset_keeps_order_and_shares_vocab():
+    corpus = TokenCorpus.from_token_lists(DOCS)
+    sub = corpus.subset([3, 0, 1])
+    assert [sub.words(i) for i in range(len(sub))] == [DOCS[3], DOCS[0], DOCS[1]]
+    assert sub.vocab is corpus.vocab
+    assert len(corpus.subset([])) == 0
+
+def test_to_csr_counts_terms():
+    corpus = TokenCorpus.from_token_lists(DOCS)
+    X = corpus.to_csr()
+    assert X.shape == (4, corpus.n_terms)
+    dense = X.toarray()
+    chip = corpus.term_index()['chip']
+    assert dense[:, chip].tolist() == [2, 0, 0, 1]
+    assert dense.sum(axis=1).tolist() == [len(d) for d in DOCS]
+    # 更宽的列数 (如与其他块对齐) 只补零列
+    assert corpus.to_csr(n_terms=corpus.n_terms + 3).shape == (4, corpus.n_terms + 3)
+    np.testing.assert_array_equal(corpus.term_counts(), dense.sum(axis=0))
+
+def test_clear_reuses_vocab_across_chunks():
+    corpus = TokenCorpus()
+    corpus.clear().extend(DOCS[:2])
+    first = corpus.term_index()['chip']
+    vocab = corpus.vocab
+    corpus.clear().extend(DOCS[2:])
+    assert len(corpus) == 2 and corpus.vocab is vocab
+    assert corpus.words(1) == DOCS[3]
+    assert corpus.term_index()['chip'] == first
+    whole = TokenCorpus.from_token_lists(DOCS)
+    assert corpus.vocab == whole.vocab
@@ -0,0 +1,341 @@
+"""
+全文倒排索引：对三份语料建立带位置信息的倒排表 (SQLite 持久化, 可增量构建)
+
+每篇文档记录内容哈希：重建时未变的文档跳过，内容或元数据变化的文档重新索引，
+源文件中已不存在的文档从索引中删除。日期入库时规范化 ('YYYY-MM-DD HH:MM:SS', UTC)，
+查询可按起止日期过滤。
+入库时同时用 entity_tagger 的词典标注实体，命中记为 '@规范名' 词条 (位置为字符偏移)：
+查询 entity_query('EAR') 即按词典匹配 (含别名、大小写规则)，不必另写同义词表。
+
+    python text_index.py build                     # 增量建索引 (只处理新增/变化/删除的文档)
+    python text_index.py count "entity list" nvidia --start 2025-04 --end 2025-06  # 同时出现的文档数
+
+    index = InvertedIndex()
+    index.count(all_of=['entity list', 'nvidia'], start='2025-04')   # 短语 + 词的布尔共现
+    index.matrix(rows={'AI': ['ai', 'llm']}, cols={'EL': ['entity list']})
+    index.search(any_of=[entity_query('EAR'), entity_query('Export Controls')])
+"""
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+from array import array
+
+import pandas as pd
+
+from corpus_store import normalize_dates
+from entity_tagger import default_tagger, dictionary_key
+
+# --- 配置 ---
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_FILE = os.path.join(ROOT_DIR, 'data', 'text_index.db')
+BATCH_SIZE = 500
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+# 实体词条前缀 (普通词条只含小写字母数字，不会冲突)
+ENTITY_PREFIX = '@'
+DICTIONARY_KEY = dictionary_key()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id           INTEGER PRIMARY KEY,
+    doc_key      TEXT UNIQUE NOT NULL,
+    corpus       TEXT,
+    source       TEXT,
+    date         TEXT,                -- 规范化的 'YYYY-MM-DD HH:MM:SS' (UTC)，无法解析时为 NULL
+    length       INTEGER,
+    content_hash TEXT NOT NULL        -- 内容 + 元数据的哈希，变化时重新索引
+);
+CREATE TABLE IF NOT EXISTS terms (
+    id   INTEGER PRIMARY KEY,
+    term TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id   INTEGER NOT NULL,
+    doc_id    INTEGER NOT NULL,
+    tf        INTEGER NOT NULL,
+    positions BLOB NOT NULL,
+    PRIMARY KEY (term_id, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_docs_source ON docs(source);
+CREATE INDEX IF NOT EXISTS idx_docs_corpus ON docs(corpus);
+CREATE INDEX IF NOT EXISTS idx_docs_date ON docs(date);
+"""
+
+def tokenize(text):
+    """小写 + 字母数字切词 (保留数字, 以便检索 Section 232 等)"""
+    return TOKEN_RE.findall(str(text).lower())
+
+def doc_key_for(corpus, url, content):
+    """文档主键: 优先用URL, 没有URL时用内容哈希"""
+    if isinstance(url, str) and url:
+        return url
+    return f"{corpus}:{hashlib.sha1(str(content).encode('utf-8')).hexdigest()[:16]}"
+
+def entity_query(name):
+    """实体词典中某个规范名的查询词条"""
+    return ENTITY_PREFIX + name
+
+def doc_hash(doc, date):
+    """内容、元数据 (语料/来源/规范化日期) 与实体词典的哈希；词典改动后文档重新标注"""
+    parts = [DICTIONARY_KEY, doc.get('corpus'), doc.get('source'), date, doc.get('content', '')]
+    return hashlib.sha1('\x1f'.join('' if p is None else str(p) for p in parts).encode('utf-8')).hexdigest()
+
+def date_bounds(start=None, end=None):
+    """起止日期 ('2025', '2025-04', '2025-04-15' ...) -> 规范化字符串区间，end 包含整个周期"""
+    fmt = '%Y-%m-%d %H:%M:%S'
+    lo = None if start is None else pd.Period(str(start)).start_time.strftime(fmt)
+    hi = None if end is None else pd.Period(str(end)).end_time.strftime(fmt)
+    return lo, hi
+
+# ============================
+# 1. 索引构建
+# ============================
+
+class InvertedIndex:
+    """带位置信息的倒排索引"""
+
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self._term_ids = dict(self.conn.execute('SELECT term, id FROM terms'))
+        self._cache = {}
+
+    def close(self):
+        self.conn.close()
+
+    def _term_id(self, term, create=False):
+        tid = self._term_ids.get(term)
+        if tid is None and create:
+            tid = self.conn.execute('INSERT INTO terms(term) VALUES (?)', (term,)).lastrowid
+            self._term_ids[term] = tid
+        return tid
+
+    def add_documents(self, docs, seen=None):
+        """增量加入文档 (dict: doc_key/corpus/source/date/content)，返回新增或重新索引的篇数
+        同一 doc_key 只取第一次出现的文档；seen 可在多次调用间共享 (并记录处理过的 doc_key)"""
+        seen = set() if seen is None else seen
+        changed = 0
+        batch = []
+        for doc in docs:
+            if doc['doc_key'] in seen:
+                continue
+            seen.add(doc['doc_key'])
+            batch.append(doc)
+            if len(batch) >= BATCH_SIZE:
+                changed += self._add_batch(batch)
+                batch = []
+        if batch:
+            changed += self._add_batch(batch)
+        if changed:
+            self._cache.clear()
+        return changed
+
+    def _add_batch(self, batch):
+        keys = [d['doc_key'] for d in batch]
+        marks = ','.join('?' * len(keys))
+        existing = {k: (i, h) for k, i, h in self.conn.execute(
+            f'SELECT doc_key, id, content_hash FROM docs WHERE doc_key IN ({marks})', keys)}
+        dates = normalize_dates([d.get('date') for d in batch])
+        changed = 0
+        with self.conn:
+            for doc, date in zip(batch, dates):
+                digest = doc_hash(doc, date)
+                old = existing.get(doc['doc_key'])
+                if old is not None and old[1] == digest:
+                    continue
+                content = doc.get('content', '')
+                tokens = tokenize(content)
+                fields = (doc.get('corpus'), doc.get('source'), date, len(tokens), digest)
+                if old is None:
+                    doc_id = self.conn.execute(
+                        'INSERT INTO docs(corpus, source, date, length, content_hash, doc_key) VALUES (?, ?, ?, ?, ?, ?)',
+                        fields + (doc['doc_key'],)).lastrowid
+                else:
+                    # 内容或元数据已变化：清掉旧倒排，原 id 重新索引
+                    doc_id = old[0]
+                    self.conn.execute('DELETE FROM postings WHERE doc_id = ?', (doc_id,))
+                    self.conn.execute(
+                        'UPDATE docs SET corpus = ?, source = ?, date = ?, length = ?, content_hash = ? WHERE id = ?',
+                        fields + (doc_id,))
+
+                positions = {}
+                for pos, tok in enumerate(tokens):
+                    positions.setdefault(tok, array('I')).append(pos)
+                for hit in default_tagger().tag(str(content)):
+                    positions.setdefault(entity_query(hit.entity), array('I')).append(hit.start)
+                self.conn.executemany(
+                    'INSERT INTO postings(term_id, doc_id, tf, positions) VALUES (?, ?, ?, ?)',
+                    [(self._term_id(t, create=True), doc_id, len(p), p.tobytes()) for t, p in positions.items()])
+                changed += 1
+        return changed
+
+    def remove_missing(self, corpus, keep):
+        """删除某语料中 doc_key 不在 keep 里的文档 (源文件已删除的行)，返回删除篇数"""
+        self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS keep_keys (doc_key TEXT PRIMARY KEY)')
+        with self.conn:
+            self.conn.execute('DELETE FROM keep_keys')
+            self.conn.executemany('INSERT OR IGNORE INTO keep_keys VALUES (?)', ((k,) for k in keep))
+            stale = 'SELECT id FROM docs WHERE corpus = ? AND doc_key NOT IN (SELECT doc_key FROM keep_keys)'
+            self.conn.execute(f'DELETE FROM postings WHERE doc_id IN ({stale})', (corpus,))
+            removed = self.conn.execute(
+                'DELETE FROM docs WHERE corpus = ? AND doc_key NOT IN (SELECT doc_key FROM keep_keys)',
+                (corpus,)).rowcount
+            self.conn.execute('DELETE FROM keep_keys')
+        if removed:
+            self._cache.clear()
+        return removed
+
+    def add_frame(self, df, corpus, seen=None):
+        """从语料DataFrame (Source/Date/URL/Content) 加入文档"""
+        def rows():
+            for rec in df.to_dict('records'):
+                content = rec.get('Content') or ''
+                date = rec.get('Date')
+                yield {
+                    'doc_key': doc_key_for(corpus, rec.get('URL'), content),
+                    'corpus': corpus,
+                    'source': rec.get('Source', rec.get('来源')),
+                    'date': None if pd.isna(date) else str(date),
+                    'content': content,
+                }
+        return self.add_documents(rows(), seen)
+
+    # ============================
+    # 2. 查询
+    # ============================
+
+    def _postings(self, term):
+        """term -> {doc_id: positions(bytes)}，带缓存"""
+        if term in self._cache:
+            return self._cache[term]
+        tid = self._term_id(term)
+        result = {}
+        if tid is not None:
+            result = dict(self.conn.execute('SELECT doc_id, positions FROM postings WHERE term_id = ?', (tid,)))
+        self._cache[term] = result
+        return result
+
+    def docs(self, query):
+        """单词、短语 ("entity list") 或实体词条 (entity_query('EAR')) 命中的文档ID集合"""
+        if query.startswith(ENTITY_PREFIX):
+            return set(self._postings(query))
+        words = tokenize(query)
+        if not words:
+            return set()
+        if len(words) == 1:
+            return set(self._postings(words[0]))
+
+        lists = [self._postings(w) for w in words]
+        candidates = set.intersection(*(set(p) for p in lists))
+        hits = set()
+        for doc_id in candidates:
+            # 短语: 第 i 个词的位置减去 i 后必须有交集
+            starts = set(array('I', lists[0][doc_id]))
+            for offset, plist in enumerate(lists[1:], start=1):
+                starts &= {p - offset for p in array('I', plist[doc_id])}
+                if not starts:
+                    break
+            if starts:
+                hits.add(doc_id)
+        return hits
+
+    def filter_docs(self, corpus=None, source=None, start=None, end=None):
+        """按语料/来源/日期筛选文档ID (start/end 含端点所在周期；日期缺失的文档在按日期筛选时排除)"""
+        clauses, params = [], []
+        if corpus is not None:
+            clauses.append('corpus = ?'); params.append(corpus)
+        if source is not None:
+            clauses.append('source = ?'); params.append(source)
+        lo, hi = date_bounds(start, end)
+        if lo is not None:
+            clauses.append('date >= ?'); params.append(lo)
+        if hi is not None:
+            clauses.append('date <= ?'); params.append(hi)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return {i for (i,) in self.conn.execute(f'SELECT id FROM docs {where}', params)}
+
+    def search(self, all_of=(), any_of=(), none_of=(), corpus=None, source=None, start=None, end=None):
+        """布尔查询: 全部命中 all_of、至少命中一个 any_of、不含 none_of"""
+        result = None
+        if any(v is not None for v in (corpus, source, start, end)):
+            result = self.filter_docs(corpus, source, start, end)
+        for q in all_of:
+            hits = self.docs(q)
+            result = hits if result is None else result & hits
+        if any_of:
+            hits = set().union(*(self.docs(q) for q in any_of))
+            result = hits if result is None else result & hits
+        if result is None:
+            result = self.filter_docs()
+        for q in none_of:
+            result = result - self.docs(q)
+        return result
+
+    def count(self, *args, **kwargs):
+        return len(self.search(*args, **kwargs))
+
+    def matrix(self, rows, cols, corpus=None, source=None, start=None, end=None):
+        """共现矩阵: rows/cols 为 {标签: [同义词/短语]}，值为同时命中两侧的文档数"""
+        base = None
+        if any(v is not None for v in (corpus, source, start, end)):
+            base = self.filter_docs(corpus, source, start, end)
+        row_sets = {k: self.search(any_of=v) for k, v in rows.items()}
+        col_sets = {k: self.search(any_of=v) for k, v in cols.items()}
+        data = [[len(r & c if base is None else r & c & base) for c in col_sets.values()]
+                for r in row_sets.values()]
+        return pd.DataFrame(data, index=list(rows), columns=list(cols))
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM docs').fetchone()[0]
+
+# ============================
+# 3. 从三份语料构建
+# ============================
+
+def build_index(path=INDEX_FILE):
+    """增量索引三份语料 (未变的文档跳过，变化的重新索引，源文件中已删除的从索引删除)"""
+    import analysis
+    corpora = {
+        'media': analysis.MEDIA_FILE,
+        'think_tank': analysis.THINK_TANK_FILE,
+        'expert': analysis.EXPERT_FILE,
+    }
+    index = InvertedIndex(path)
+    for corpus, csv_path in corpora.items():
+        if not os.path.exists(csv_path):
+            print(f"[Warn] 找不到 {csv_path}")
+            continue
+        changed = 0
+        seen = set()
+        for chunk in analysis.iter_corpus_chunks(csv_path, ['Source', '来源', 'Date', 'URL', 'Content']):
+            changed += index.add_frame(chunk, corpus, seen)
+        removed = index.remove_missing(corpus, seen)
+        print(f"[{corpus}] 新增/更新 {changed} 篇, 删除 {removed} 篇")
+    return index
+
+def main():
+    ap = argparse.ArgumentParser(description='语料倒排索引')
+    ap.add_argument('--index', default=INDEX_FILE, help='索引文件路径')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    sub.add_parser('build', help='增量建索引')
+    q = sub.add_parser('count', help='统计同时命中所有词/短语的文档数')
+    q.add_argument('terms', nargs='+')
+    q.add_argument('--corpus', default=None)
+    q.add_argument('--start', default=None, help='起始日期 (YYYY / YYYY-MM / YYYY-MM-DD)')
+    q.add_argument('--end', default=None, help='结束日期 (含该周期)')
+    args = ap.parse_args()
+
+    if args.cmd == 'build':
+        index = build_index(args.index)
+        print(f"索引共 {len(index)} 篇文档: {args.index}")
+    else:
+        index = InvertedIndex(args.index)
+        print(index.count(all_of=args.terms, corpus=args.corpus, start=args.start, end=args.end))
+    index.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,22 @@
+import os
+import sys
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 import seaborn as sns
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from text_index import build_index, entity_query
+
+# 图表构建脚本 (build_figures.py) 据此判断是否需要重绘
+FIGURE_INPUTS = [
+    'data/us_mainstream_media_data.csv',
+    'data/us_think_tank_data.csv',
+    'data/us_experts_twitter_data.csv',
+    'text_index.py',
+    'analysis.py',
+]
+
 # 设置绘图风格
 plt.rcParams['font.sans-serif'] = ['SimHei']
 plt.rcParams['axes.unicode_minus'] = False
@@ -20,12 +34,34 @@ df_rev = pd.DataFrame({
 
 tech_fields = ['Logic (GPU/CPU)', 'Memory (DRAM)', 'Stacking', 'AI/LLM']
 policy_intensity = ['Low Intensity', 'Trade Friction', 'EAR Controls', 'Entity List']
-heatmap_data = np.array([
-    [20, 40, 60, 85],
-    [30, 50, 75, 40],
-    [15, 35, 80, 95],
-    [10, 25, 70, 98]
-])
+# 热力图由倒排索引统计：每个技术领域的文档中，同时提及各类政策的比例 (%)
+# Low Intensity = 提及该领域但未提及任何管制政策
+# 各类别由 entity_tagger 词典中的规范名组成 (别名、大小写规则都在词典里，这里不再另列同义词)
+tech_entities = {
+    'Logic (GPU/CPU)': ['GPU', 'CPU'],
+    'Memory (DRAM)': ['Memory Chips', 'DRAM', 'HBM', 'NAND'],
+    'Stacking': ['Advanced Packaging'],
+    'AI/LLM': ['AI', 'AI Chips'],
+}
+policy_entities = {
+    'Trade Friction': ['Tariffs', 'Trade War', 'Section 232'],
+    'EAR Controls': ['EAR', 'Export Controls'],
+    'Entity List': ['Entity List'],
+}
+tech_queries = {k: [entity_query(e) for e in v] for k, v in tech_entities.items()}
+policy_queries = {k: [entity_query(e) for e in v] for k, v in policy_entities.items()}
+# 索引或查询出错时直接报错，不回退到虚构的数值
+index = build_index()
+all_policy = [q for terms in policy_queries.values() for q in terms]
+rows = []
+for field in tech_fields:
+    tech_docs = index.search(any_of=tech_queries[field])
+    total = max(len(tech_docs), 1)
+    low = len(tech_docs - index.search(any_of=all_policy))
+    rows.append([low] + [len(tech_docs & index.search(any_of=policy_queries[p])) for p in policy_intensity[1:]])
+    rows[-1] = [round(v / total * 100) for v in rows[-1]]
+heatmap_data = np.array(rows, dtype=int)
+index.close()
 
 # --- 创建画布 ---
 # 稍微减小整体 figsize 宽度，避免在双栏中显得过度拉伸
@@ -55,7 +91,7 @@ ax1.set_position([0.15, 0.6, 0.6, 0.32])
 # 第二张图保持较宽的尺寸以展示复杂矩阵
 sns.heatmap(heatmap_data, annot=True, fmt="d", cmap="YlGnBu", 
             xticklabels=policy_intensity, yticklabels=tech_fields, 
-            ax=ax2, cbar_kws={'label': 'Expert Focus Intensity', 'shrink': 0.8},
+            ax=ax2, cbar_kws={'label': '% of docs co-mentioning', 'shrink': 0.8},
             annot_kws={"size": 13, "weight": "bold"})
 
 ax2.set_title('(b):制裁压力下的技术突围热力分布', fontsize=15, pad=15, fontweight='bold')
@@ -1,20 +1,53 @@
+import os
+import sys
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 import seaborn as sns
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import analysis
+from grouped_stats import GroupedStats
+
+# 图表构建脚本 (build_figures.py) 据此判断是否需要重绘
+FIGURE_INPUTS = [
+    'data/us_mainstream_media_data.csv',
+    'data/us_think_tank_data.csv',
+    'data/us_experts_twitter_data.csv',
+    'analysis.py',
+    'grouped_stats.py',
+]
+
 # --- 全局设置 ---
 plt.rcParams['font.sans-serif'] = ['SimHei']
 plt.rcParams['axes.unicode_minus'] = False
 
 # 1. 数据准备 - 图3.6a (情感矩阵)
-summary_data = {
-    'Source': ['主流媒体', '核心智库', '技术专家', '社交媒体', '官方声明'],
-    'Mean_Sentiment': [-0.25, 0.08, 0.15, -0.12, 0.02],
-    'Volatility': [0.45, 0.05, 0.18, 0.38, 0.12],
-    'Topic_Coverage': [90, 75, 85, 60, 50]
+# 三类主体均由语料实时统计；没有语料的主体不画 (缺少语料文件时直接报错，不回退到人工研判值)
+corpora = {
+    '主流媒体': analysis.MEDIA_FILE,
+    '核心智库': analysis.THINK_TANK_FILE,
+    '技术专家': analysis.EXPERT_FILE,
 }
-df_summary = pd.DataFrame(summary_data)
+# 分块读取 + 可合并累加器，语料规模不受内存限制
+stats = GroupedStats()
+for group, path in corpora.items():
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"找不到 {path}，无法统计 {group}")
+    for chunk in analysis.iter_corpus_chunks(path, ['Content']):
+        chunk['Group'] = group
+        chunk['sentiment'] = chunk['Content'].apply(analysis.get_sentiment)
+        stats.update(chunk, source_col='Group', date_col=None)
+
+measured = stats.rollup('source').reindex(list(corpora))
+df_summary = pd.DataFrame({
+    'Source': list(corpora),
+    'Mean_Sentiment': measured['mean'].to_numpy(),
+    'Volatility': measured['volatility'].to_numpy(),
+    'Topic_Coverage': measured['coverage_topic'].to_numpy(),
+})
+# 全部文档合并后的均值与波动率，作为区域划分的基准线
+pooled = stats.rollup('bucket').iloc[0]
 
 # 2. 数据准备 - 图3.6b (雷达图)
 labels = ['政治敏感度', '技术深度', '情感烈度', '制度严密性', '市场关联度']
@@ -36,7 +69,7 @@ fig = plt.figure(figsize=(20, 8), dpi=300)
 ax1 = fig.add_subplot(1, 2, 1)
 
 # 使用更丰富的颜色序列
-vivid_colors = ['#FF1493', '#1E90FF', '#32CD32', '#FFA500', '#8A2BE2']
+vivid_colors = ['#FF1493', '#1E90FF', '#32CD32']
 scatter = ax1.scatter(df_summary['Mean_Sentiment'], 
                      df_summary['Volatility'], 
                      s=df_summary['Topic_Coverage'] * 35, # 加大坐标点
@@ -60,11 +93,22 @@ ax1.set_title('(a):美方主体情感定力与倾向矩阵', fontsize=22, pad=25
 # 加大刻度字体
 ax1.tick_params(axis='both', labelsize=15)
 
-# 区域说明文字加大
-ax1.fill_between([-0.5, 0], 0.25, 0.5, color='red', alpha=0.08)
-ax1.text(-0.35, 0.42, '舆论动员区', color='#c0392b', fontsize=16, weight='bold')
-ax1.fill_between([0, 0.5], 0, 0.2, color='green', alpha=0.08)
-ax1.text(0.3, 0.1, '技术理性区', color='#27ae60', fontsize=16, weight='bold')
+# 坐标范围随实测值缩放
+x, y = df_summary['Mean_Sentiment'], df_summary['Volatility']
+x_pad = max(x.max() - min(x.min(), 0), 0.05) * 0.4
+x_lo, x_hi = min(x.min(), 0) - x_pad, x.max() + x_pad
+y_hi = y.max() * 1.35
+ax1.set_xlim(x_lo, x_hi)
+ax1.set_ylim(0, y_hi)
+
+# 区域以全体文档的均值/波动率为界：偏负面且波动大 = 舆论动员区，偏正面且波动小 = 技术理性区
+ax1.axvline(pooled['mean'], color='gray', linestyle=':', alpha=0.6)
+ax1.axhline(pooled['volatility'], color='gray', linestyle=':', alpha=0.6)
+ax1.fill_between([x_lo, pooled['mean']], pooled['volatility'], y_hi, color='red', alpha=0.08)
+ax1.text(x_lo + x_pad * 0.2, y_hi * 0.92, '舆论动员区', color='#c0392b', fontsize=16, weight='bold')
+ax1.fill_between([pooled['mean'], x_hi], 0, pooled['volatility'], color='green', alpha=0.08)
+ax1.text(x_hi - x_pad * 0.2, pooled['volatility'] * 0.15, '技术理性区', color='#27ae60', fontsize=16,
+         weight='bold', ha='right')
 
 ax1.grid(True, linestyle=':', alpha=0.6)
 